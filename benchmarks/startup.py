@@ -0,0 +1,210 @@
+"""
+Benchmark di avvio di ModernShutdownScheduler.
+
+Ogni misura avvia un processo separato (per avere RSS di picco e import a freddo
+significativi) con una configurazione temporanea di N regole e backend finti:
+avvio automatico, tray e azioni di alimentazione non toccano il sistema.
+Metriche per esecuzione (tempi misurati dal lancio del processo):
+- interpreter_s: avvio dell'interprete fino al codice del benchmark
+- import_s: import della GUI
+- armed_s: scheduler con le scadenze calcolate
+- first_frame_s: primo frame della finestra
+- peak_rss_kb: RSS di picco del processo
+
+La GUI gira su un server X virtuale (Xvfb) se disponibile, altrimenti sul DISPLAY
+corrente. Il risultato e' JSON, da confrontare tra una release e l'altra.
+
+    python benchmarks/startup.py --rules 0 10 100 1000 --repeat 5 --output startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS = ("interpreter_s", "import_s", "armed_s", "first_frame_s", "peak_rss_kb")
+
+def make_config(n_rules):
+    """Configurazione con `n_rules` regole distinte, distribuite sulla settimana."""
+    schedules = []
+    for i in range(n_rules):
+        minute = (i * 7) % (24 * 60)
+        schedules.append({
+            'days': sorted({i % 7, (i * 3 + 1) % 7}),
+            'time': f"{minute // 60:02d}:{minute % 60:02d}",
+            'action': 'shutdown' if i % 2 else 'hibernate',
+            'enabled': i % 5 != 0,
+        })
+    return {
+        "schedules": schedules,
+        "autostart": False,
+        "theme": "dark",
+        "ui_scale": 1.0,
+        "start_minimized_tray": False,
+    }
+
+def run_child():
+    """Eseguito nel processo figlio: avvia la GUI con backend finti e stampa le misure."""
+    started = time.perf_counter()
+    # Tempo dal lancio del processo (lato padre) a qui: avvio dell'interprete
+    interpreter = time.time() - float(os.environ["BENCH_LAUNCHED_AT"])
+    sys.path.insert(0, ROOT)
+    from shutdown_scheduler import gui
+    imported = time.perf_counter()
+
+    # Backend di piattaforma finti (le azioni usano il backend "dry-run")
+    gui.set_autostart = lambda enabled: True
+    gui.is_autostart_enabled = lambda: False
+    gui.ModernShutdownScheduler._create_tray_icon = lambda self: None
+
+    marks = {}
+    app = gui.ModernShutdownScheduler(action_backend="dry-run")
+
+    def _wait_armed():
+        app.scheduler.armed.wait()
+        marks['armed'] = time.perf_counter()
+
+    def _on_map(event=None):
+        if 'first_frame' in marks or event is None or event.widget is not app:
+            return
+        # Forza geometria e ridisegni pendenti: da qui la finestra e' completa
+        app.update_idletasks()
+        marks['first_frame'] = time.perf_counter()
+        app.after(0, _finish)
+
+    def _finish():
+        app.scheduler.armed.wait(10)
+        watcher.join(10)
+        app._on_quit()
+
+    watcher = threading.Thread(target=_wait_armed, daemon=True)
+    watcher.start()
+    app.bind('<Map>', _on_map, add='+')
+    app.mainloop()
+
+    result = {
+        "interpreter_s": interpreter,
+        "import_s": imported - started,
+        "armed_s": interpreter + marks.get('armed', float('nan')) - started,
+        "first_frame_s": interpreter + marks.get('first_frame', float('nan')) - started,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+    print(json.dumps(result))
+
+def _peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS riporta byte, Linux kilobyte
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def start_virtual_display():
+    """Avvia Xvfb su un display libero; ritorna (processo, DISPLAY) o (None, None)."""
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None, None
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            continue
+        display = f":{number}"
+        proc = subprocess.Popen(
+            [xvfb, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                return proc, display
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+        proc.kill()
+    return None, None
+
+def run_once(n_rules, env):
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(make_config(n_rules), f)
+        child_env = dict(env, SHUTDOWN_SCHEDULER_CONFIG_DIR=tmp, BENCH_LAUNCHED_AT=repr(time.time()))
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            env=child_env, capture_output=True, text=True, timeout=120,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark fallito con {n_rules} regole:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def summarize(samples):
+    summary = {}
+    for metric in METRICS:
+        values = [s[metric] for s in samples if s.get(metric) is not None]
+        if not values:
+            continue
+        summary[metric] = {
+            "min": min(values),
+            "median": statistics.median(values),
+            "mean": statistics.fmean(values),
+            "max": max(values),
+        }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[0, 10, 100, 1000], metavar="N",
+                        help="numero di regole per scenario (default: 0 10 100 1000)")
+    parser.add_argument("--repeat", type=int, default=5, help="esecuzioni per scenario (default: 5)")
+    parser.add_argument("--output", metavar="FILE", help="scrive il JSON su FILE invece che su stdout")
+    parser.add_argument("--no-xvfb", action="store_true", help="usa il DISPLAY corrente invece di Xvfb")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child()
+        return
+
+    env = dict(os.environ)
+    xvfb = None
+    if not args.no_xvfb:
+        xvfb, display = start_virtual_display()
+        if display:
+            env["DISPLAY"] = display
+    if not env.get("DISPLAY") and sys.platform.startswith("linux"):
+        parser.error("nessun DISPLAY disponibile: installa Xvfb o avvia da una sessione grafica")
+    try:
+        scenarios = []
+        for n_rules in args.rules:
+            samples = [run_once(n_rules, env) for _ in range(args.repeat)]
+            scenarios.append({"rules": n_rules, "samples": samples, "summary": summarize(samples)})
+            print(f"{n_rules:>5} regole: first frame {scenarios[-1]['summary']['first_frame_s']['median'] * 1000:.0f} ms "
+                  f"(mediana)", file=sys.stderr)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait(5)
+
+    report = {
+        "benchmark": "startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "scenarios": scenarios,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
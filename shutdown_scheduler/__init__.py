@@ -0,0 +1,32 @@
+"""
+Shutdown Scheduler: nucleo senza GUI (configurazione, motore di scheduling,
+esecuzione delle azioni). Il front end CustomTkinter (`shutdown_scheduler.gui`)
+e i backend di piattaforma (`autostart`) si caricano solo quando servono.
+
+I nomi esportati qui sotto si caricano al primo accesso: importare un singolo
+sottomodulo (es. `profiling` per `--profile-imports`) non trascina tutto il nucleo.
+"""
+
+import importlib
+
+# Nome esportato -> sottomodulo che lo definisce
+_EXPORTS = {
+    "APP_NAME": "config", "CONFIG_DIR": "config", "CONFIG_FILE": "config", "DEFAULT_CONFIG": "config",
+    "ConfigWriter": "config", "load_config": "config", "save_config": "config",
+    "Schedule": "model",
+    "ScheduleIndex": "engine", "SchedulerThread": "engine", "minute_of_week": "engine",
+    "perform_action": "actions",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # gli accessi successivi non passano di qui
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,193 @@
+"""
+Esecuzione delle azioni di alimentazione (spegnimento, ibernazione).
+
+Le azioni passano da un backend intercambiabile (`action_backend` in config):
+- "windows": comandi `shutdown` di Windows
+- "systemd": `systemctl` (o `loginctl` se systemctl manca) su Linux
+- "dry-run": non esegue nulla, registra cosa sarebbe stato eseguito (test di carico)
+"auto" sceglie in base al sistema. `ActionExecutor` esegue le azioni su un pool
+limitato di thread con timeout, senza bloccare lo scheduler, e conserva l'esito.
+"""
+
+import sys
+import time
+import shutil
+import datetime
+import threading
+import subprocess
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import ACTION_RESULTS, ACTION_SECONDS
+
+# Tempo massimo concesso a un comando prima di considerarlo fallito
+ACTION_TIMEOUT = 30.0
+# Thread del pool e azioni accettate in attesa/esecuzione contemporaneamente
+MAX_WORKERS = 2
+MAX_PENDING = 8
+# Esiti conservati per la consultazione (es. metriche, diagnostica)
+RESULTS_KEPT = 100
+
+class ActionResult:
+    """Esito di un'azione: comando, durata, codice di uscita o errore.
+
+    `outcome` riassume l'esito per le metriche: codice di uscita, "timeout",
+    "rejected" (coda piena) o "error".
+    """
+
+    __slots__ = ('action', 'backend', 'command', 'started', 'duration', 'returncode', 'error', 'outcome')
+
+    def __init__(self, action, backend, command, started, duration=0.0, returncode=None, error=None,
+                 outcome=None):
+        self.action = action
+        self.backend = backend
+        self.command = command
+        self.started = started
+        self.duration = duration
+        self.returncode = returncode
+        self.error = error
+        if outcome is None:
+            outcome = str(returncode) if error is None else 'error'
+        self.outcome = outcome
+
+    @property
+    def ok(self):
+        return self.error is None and self.returncode == 0
+
+    def __repr__(self):
+        outcome = self.error or f"exit {self.returncode}"
+        return f"ActionResult({self.action!r} via {self.backend}: {outcome} in {self.duration:.2f}s)"
+
+class ActionBackend:
+    """Backend basato su comandi: sottoclassi definiscono `name` e `COMMANDS`."""
+
+    name = 'base'
+    COMMANDS = {}
+
+    def command(self, action):
+        try:
+            return list(self.COMMANDS[action])
+        except KeyError:
+            raise ValueError(f"azione non supportata da {self.name}: {action!r}") from None
+
+    def run(self, action, timeout=ACTION_TIMEOUT):
+        started = datetime.datetime.now()
+        t0 = time.monotonic()
+        command = None
+        try:
+            command = self.command(action)
+            returncode = self._execute(command, timeout)
+            return ActionResult(action, self.name, command, started, time.monotonic() - t0, returncode)
+        except subprocess.TimeoutExpired:
+            error, outcome = f"timeout dopo {timeout:g}s", 'timeout'
+        except (OSError, ValueError) as e:
+            error, outcome = str(e), 'error'
+        return ActionResult(action, self.name, command, started, time.monotonic() - t0, error=error, outcome=outcome)
+
+    def _execute(self, command, timeout):
+        return subprocess.run(command, timeout=timeout).returncode
+
+class WindowsBackend(ActionBackend):
+    name = 'windows'
+    COMMANDS = {
+        'shutdown': ('shutdown', '/s', '/f', '/t', '0'),
+        'hibernate': ('shutdown', '/h'),
+    }
+
+class SystemdBackend(ActionBackend):
+    name = 'systemd'
+    COMMANDS = {
+        'shutdown': ('systemctl', 'poweroff'),
+        'hibernate': ('systemctl', 'hibernate'),
+    }
+
+    def command(self, action):
+        command = super().command(action)
+        if shutil.which('systemctl') is None and shutil.which('loginctl') is not None:
+            # Sessioni senza systemctl: logind espone le stesse operazioni
+            command[0] = 'loginctl'
+        return command
+
+class DryRunBackend(ActionBackend):
+    """Non tocca il sistema: registra le azioni che sarebbero state eseguite."""
+
+    name = 'dry-run'
+    COMMANDS = dict(WindowsBackend.COMMANDS) if sys.platform == 'win32' else dict(SystemdBackend.COMMANDS)
+
+    def __init__(self):
+        self.recorded = collections.deque(maxlen=10000)
+        self._lock = threading.Lock()
+
+    def _execute(self, command, timeout):
+        with self._lock:
+            self.recorded.append((datetime.datetime.now(), command))
+        print('[dry-run] eseguirei:', ' '.join(command))
+        return 0
+
+BACKENDS = {
+    WindowsBackend.name: WindowsBackend,
+    SystemdBackend.name: SystemdBackend,
+    DryRunBackend.name: DryRunBackend,
+}
+
+def default_backend_name():
+    return WindowsBackend.name if sys.platform == 'win32' else SystemdBackend.name
+
+def create_backend(name=None):
+    """Backend per `name` ("auto"/None = in base al sistema); nomi sconosciuti usano il default."""
+    if name in (None, '', 'auto'):
+        name = default_backend_name()
+    backend = BACKENDS.get(name)
+    if backend is None:
+        print(f"Backend azioni sconosciuto {name!r}, uso {default_backend_name()}")
+        backend = BACKENDS[default_backend_name()]
+    return backend()
+
+class ActionExecutor:
+    """Esegue le azioni in background su un pool limitato, con timeout ed esiti registrati."""
+
+    def __init__(self, backend=None, timeout=ACTION_TIMEOUT, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.backend = backend or create_backend()
+        self.timeout = timeout
+        self.results = collections.deque(maxlen=RESULTS_KEPT)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Action")
+
+    def submit(self, action):
+        """Accoda `action` e ritorna subito un Future, o None se la coda e' piena."""
+        if not self._slots.acquire(blocking=False):
+            self._record(ActionResult(action, self.backend.name, None, datetime.datetime.now(), error="coda piena",
+                                      outcome='rejected'))
+            return None
+        try:
+            future = self._pool.submit(self._run, action)
+        except RuntimeError:
+            # Executor gia' chiuso (uscita dell'app)
+            self._slots.release()
+            return None
+        future.add_done_callback(lambda f: self._slots.release())
+        return future
+
+    def run(self, action):
+        """Esecuzione sincrona (stesso backend e registrazione dell'esito)."""
+        return self._run(action)
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait)
+
+    def _run(self, action):
+        result = self.backend.run(action, self.timeout)
+        self._record(result)
+        return result
+
+    def _record(self, result):
+        self.results.append(result)
+        ACTION_RESULTS.inc(action=result.action, backend=result.backend, outcome=result.outcome)
+        if result.command is not None:
+            ACTION_SECONDS.observe(result.duration, action=result.action, backend=result.backend)
+        if not result.ok:
+            print('Errore esecuzione azione:', result)
+
+def perform_action(action_name, backend=None):
+    """Esegue subito `action_name` con il backend indicato (default: quello del sistema)."""
+    return (backend or create_backend()).run(action_name)
@@ -0,0 +1,49 @@
+"""
+Avvio automatico al login tramite la chiave Run del registro di Windows.
+`winreg` viene importato solo quando serve: su altre piattaforme le funzioni
+segnalano semplicemente che l'avvio automatico non e' disponibile.
+"""
+
+import os
+import sys
+
+REGISTRY_RUN_KEY = r"Software\\Microsoft\\Windows\\CurrentVersion\\Run"
+REGISTRY_VALUE_NAME = "ShutdownScheduler"
+
+# Funzioni di utilità per il registro di sistema
+def set_autostart(enabled: bool):
+    exe_path = getattr(sys, 'frozen', False) and sys.executable or os.path.abspath(sys.argv[0])
+    if not getattr(sys, 'frozen', False):
+        pythonw = sys.executable.replace('python.exe', 'pythonw.exe')
+        if os.path.exists(pythonw):
+            cmd = f'"{pythonw}" "{exe_path}"'
+        else:
+            cmd = f'"{sys.executable}" "{exe_path}"'
+    else:
+        cmd = f'"{exe_path}"'
+
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, REGISTRY_RUN_KEY, 0, winreg.KEY_WRITE) as key:
+            if enabled:
+                winreg.SetValueEx(key, REGISTRY_VALUE_NAME, 0, winreg.REG_SZ, cmd)
+            else:
+                try:
+                    winreg.DeleteValue(key, REGISTRY_VALUE_NAME)
+                except FileNotFoundError:
+                    pass
+        return True
+    except Exception as e:
+        print('Errore autostart:', e)
+        return False
+
+def is_autostart_enabled():
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, REGISTRY_RUN_KEY, 0, winreg.KEY_READ) as key:
+            value, _ = winreg.QueryValueEx(key, REGISTRY_VALUE_NAME)
+            return bool(value)
+    except FileNotFoundError:
+        return False
+    except Exception:
+        return False
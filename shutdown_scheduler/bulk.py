@@ -0,0 +1,209 @@
+"""
+Importazione ed esportazione in blocco delle regole, in JSON Lines o CSV.
+
+L'import legge il file riga per riga e valida/deduplica le regole a lotti (le
+stesse regole di `schema.normalize_rule` e la chiave canonica di `DuplicateIndex`):
+il chiamante riceve solo le regole accettate e le applica in un'unica transazione
+(un salvataggio, un rendering). Le righe scartate e le regole accettate in conflitto
+con altre (stessa finestra di `conflict_window` minuti) finiscono nel riepilogo.
+L'export scrive una regola alla volta, senza copie intermedie della lista.
+
+CSV: intestazione `days,time,action,enabled,missed_policy,missed_window,priority`, con i
+giorni 0-6 (0 = lunedi') separati da spazi, es. `0 1 2 3 4,22:30,shutdown,true,,,`.
+"""
+
+import csv
+import sys
+import json
+import itertools
+from pathlib import Path
+
+from .conflicts import ConflictIndex
+from .duplicates import DuplicateIndex
+from .model import Schedule
+from .schema import normalize_rule
+
+FORMAT_JSONL = 'jsonl'
+FORMAT_CSV = 'csv'
+FORMATS = (FORMAT_JSONL, FORMAT_CSV)
+CSV_FIELDS = ('days', 'time', 'action', 'enabled', 'missed_policy', 'missed_window', 'priority')
+# Righe validate e deduplicate per lotto
+BATCH_SIZE = 500
+# Righe scartate riportate una per una nel riepilogo
+MAX_REPORTED = 20
+
+_TRUE = {'1', 'true', 'yes', 'si', 'sì', 'on'}
+_FALSE = {'0', 'false', 'no', 'off'}
+
+def detect_format(path, default=FORMAT_JSONL):
+    """Formato dall'estensione del file (.csv, .jsonl/.ndjson)."""
+    suffix = Path(str(path)).suffix.lower()
+    if suffix == '.csv':
+        return FORMAT_CSV
+    if suffix in ('.jsonl', '.ndjson'):
+        return FORMAT_JSONL
+    return default
+
+class ImportReport:
+    """Esito di un import: regole accettate, righe scartate (numero riga, motivo) e
+    regole accettate in conflitto `(regola, [Conflict])`."""
+
+    def __init__(self):
+        self.accepted = []
+        self.rejected = []
+        self.duplicates = 0
+        self.conflicts = []
+        self.conflict_window = None
+
+    def summary(self):
+        lines = [f"Regole importate: {len(self.accepted)}, scartate: {len(self.rejected)}"
+                 f" (di cui duplicate: {self.duplicates})"]
+        for line_no, reason in self.rejected[:MAX_REPORTED]:
+            lines.append(f"  riga {line_no}: {reason}")
+        if len(self.rejected) > MAX_REPORTED:
+            lines.append(f"  ... altre {len(self.rejected) - MAX_REPORTED} righe scartate")
+        if self.conflicts:
+            lines.append(f"Regole importate in conflitto: {len(self.conflicts)}"
+                         f" (una sola azione ogni {self.conflict_window} min, vince la priorita' piu' alta)")
+            for s, found in self.conflicts[:MAX_REPORTED]:
+                others = ", ".join(f"{c.action} alle {c.time} ({'stesso minuto' if c.collision else f'a {c.distance} min'})"
+                                   for c in found[:3])
+                more = f" e altre {len(found) - 3}" if len(found) > 3 else ""
+                lines.append(f"  {s.action} alle {s.time}: {others}{more}")
+            if len(self.conflicts) > MAX_REPORTED:
+                lines.append(f"  ... altre {len(self.conflicts) - MAX_REPORTED} regole in conflitto")
+        return "\n".join(lines)
+
+def _csv_value(field, text):
+    text = text.strip()
+    if field == 'days':
+        parts = text.replace(',', ' ').replace(';', ' ').split()
+        return [int(p) for p in parts]
+    if field == 'enabled':
+        if text.lower() in _TRUE:
+            return True
+        if text.lower() in _FALSE:
+            return False
+        raise ValueError(f"enabled non valido {text!r}")
+    if field in ('missed_window', 'priority'):
+        return int(text)
+    return text
+
+def _iter_jsonl(stream):
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line), None
+        except ValueError as e:
+            yield line_no, None, f"JSON non valido ({e.msg})"
+
+def _iter_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        line_no = reader.line_num
+        try:
+            raw = {field: _csv_value(field, value) for field, value in row.items()
+                   if field in CSV_FIELDS and value is not None and value.strip()}
+        except ValueError as e:
+            yield line_no, None, str(e)
+            continue
+        yield line_no, raw, None
+
+def iter_records(stream, fmt):
+    """Genera `(numero riga, regola grezza o None, errore o None)` leggendo in streaming."""
+    if fmt == FORMAT_CSV:
+        return _iter_csv(stream)
+    if fmt == FORMAT_JSONL:
+        return _iter_jsonl(stream)
+    raise ValueError(f"formato sconosciuto {fmt!r}")
+
+def import_rules(stream, fmt, existing=None, batch_size=BATCH_SIZE):
+    """Valida e deduplica le regole lette da `stream`; ritorna un `ImportReport`.
+
+    `existing` e' il `DuplicateIndex` delle regole gia' presenti: non viene
+    modificato, le regole accettate vanno applicate dal chiamante.
+    """
+    report = ImportReport()
+    seen = DuplicateIndex()
+    records = iter_records(stream, fmt)
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            return report
+        for line_no, raw, error in batch:
+            if error is None:
+                rule, error = normalize_rule(raw)
+            if error is not None:
+                report.rejected.append((line_no, error))
+                continue
+            s = Schedule.from_dict(rule)
+            if seen.find_duplicate(s) is not None or (
+                existing is not None and existing.find_duplicate(s) is not None
+            ):
+                report.duplicates += 1
+                report.rejected.append((line_no, f"duplicato ({s.time}, {s.action})"))
+                continue
+            seen.add(s)
+            report.accepted.append(s)
+
+def find_conflicts(report, schedules, conflict_window):
+    """Registra in `report.conflicts` le regole accettate in conflitto con `schedules` o tra loro."""
+    index = ConflictIndex(schedules)
+    report.conflict_window = conflict_window
+    for s in report.accepted:
+        found = index.conflicts(s, conflict_window)
+        if found:
+            report.conflicts.append((s, found))
+        index.add(s)
+    return report.conflicts
+
+def export_rules(schedules, stream, fmt):
+    """Scrive le regole su `stream` una alla volta; ritorna quante ne ha scritte."""
+    count = 0
+    if fmt == FORMAT_CSV:
+        writer = csv.writer(stream, lineterminator='\n')
+        writer.writerow(CSV_FIELDS)
+        for s in schedules:
+            writer.writerow((' '.join(map(str, s.days)), s.time, s.action,
+                             'true' if s.enabled else 'false', s.missed_policy, s.missed_window, s.priority))
+            count += 1
+    elif fmt == FORMAT_JSONL:
+        for s in schedules:
+            stream.write(json.dumps(s.to_dict(), ensure_ascii=False))
+            stream.write('\n')
+            count += 1
+    else:
+        raise ValueError(f"formato sconosciuto {fmt!r}")
+    return count
+
+def open_text(path, mode):
+    """Apre `path` in testo UTF-8 (newline gestiti dal modulo csv); '-' = stdin/stdout."""
+    if str(path) == '-':
+        return _NoClose(sys.stdin if 'r' in mode else sys.stdout)
+    return open(path, mode, encoding='utf-8-sig' if 'r' in mode else 'utf-8', newline='')
+
+class _NoClose:
+    # stdin/stdout restano aperti alla fine del blocco `with`
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __enter__(self):
+        return self.stream
+
+    def __exit__(self, *exc):
+        return False
+
+def import_file(path, cfg, fmt=None):
+    """Importa da `path` nella config `cfg` (modificata in un solo passaggio); ritorna il report."""
+    fmt = fmt or detect_format(path)
+    with open_text(path, 'r') as stream:
+        report = import_rules(stream, fmt, DuplicateIndex(cfg['schedules']))
+    find_conflicts(report, cfg['schedules'], cfg['conflict_window'])
+    cfg['schedules'].extend(report.accepted)
+    return report
+
+def export_file(path, schedules, fmt=None):
+    fmt = fmt or detect_format(path)
+    with open_text(path, 'w') as stream:
+        return export_rules(schedules, stream, fmt)
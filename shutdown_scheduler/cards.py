@@ -0,0 +1,495 @@
+"""
+Lista delle regole in stile "cards", virtualizzata sul canvas della colonna sinistra.
+
+Esistono come widget solo le card visibili (piu' un piccolo margine): un pool di
+card gia' costruite viene riassegnato ai dati delle regole durante lo scroll,
+quindi il costo di rendering dipende dall'altezza della finestra e non dal
+numero di regole.
+
+Due motori intercambiabili (`render_engine` in config): "widgets" usa card
+CustomTkinter riciclate, "canvas" disegna le card come item di un unico canvas.
+
+Gli aggiornamenti sono incrementali: le card sono indicizzate per regola, una
+regola che cambia posizione sposta la sua card, e ogni card riconfigura solo i
+widget i cui valori sono cambiati (es. la sola pill ON/OFF dopo un toggle).
+L'ordine di visualizzazione (`order`) e' separato dagli indici delle regole:
+cambiare ordinamento sposta le card senza ricostruirle.
+"""
+
+import customtkinter as ctk
+
+from .model import ALL_DAYS_MASK, WEEKDAYS_MASK, WEEKEND_MASK, mask_to_days
+from .theme import (
+    ACCENT_COLOR, TEXT_COLOR, CARD_BG, CARD_BG_HOVER, CARD_BG_SELECTED, CARD_BORDER, MUTED_TEXT,
+)
+
+# Geometria di uno slot (pixel a scala 100%): card + spazio verticale tra le card
+CARD_HEIGHT = 128
+CARD_GAP = 20
+CARD_PADX = 12
+# Card extra costruite sopra e sotto l'area visibile per uno scroll fluido
+OVERSCAN = 2
+
+def day_pill_texts(day_mask, day_name):
+    """Testi delle pill dei giorni: gruppi riconosciuti o singoli giorni ordinati."""
+    if day_mask == ALL_DAYS_MASK:
+        return ['Tutti i giorni']
+    if day_mask == WEEKDAYS_MASK:
+        return ['Feriali']
+    if day_mask == WEEKEND_MASK:
+        return ['Weekend']
+    return [day_name(d) for d in mask_to_days(day_mask)]
+
+def card_key(s):
+    """Chiave stabile della regola mostrata in una card: `uid` sopravvive a `replace()`."""
+    return s.uid
+
+class _Card:
+    """Card riutilizzabile: i widget si creano una volta e `bind` li aggiorna con una regola."""
+
+    def __init__(self, view):
+        self.view = view
+        self.idx = None
+        self.key = None
+        # Ultimi valori mostrati per campo: `bind` riconfigura solo le differenze
+        self.shown = {}
+        app = view.app
+        canvas = view.canvas
+
+        self.frame = card = ctk.CTkFrame(canvas, corner_radius=12, fg_color=CARD_BG, border_color=CARD_BORDER, border_width=1)
+        # Griglia a 4 colonne: 0=icon, 1=contenuti (flex), 2=spacer, 3=azioni (destra)
+        card.grid_columnconfigure(0, weight=0, minsize=38)
+        card.grid_columnconfigure(1, weight=1)
+        card.grid_columnconfigure(2, weight=0, minsize=12)
+        card.grid_columnconfigure(3, weight=0)
+
+        # Icon chip (monocromatica)
+        self.icon_chip = ctk.CTkLabel(card, text='', width=30, height=30, fg_color="#1e1e1e", corner_radius=15, text_color=TEXT_COLOR)
+        self.icon_chip.grid(row=0, column=0, rowspan=2, sticky='n', padx=(12, 6), pady=(12, 0))
+
+        # Riga 0: Titolo a sinistra, Stato pill a destra
+        self.title = ctk.CTkLabel(card, text='', font=("Segoe UI", 16, "bold"))
+        self.title.grid(row=0, column=1, sticky='w', padx=(8, 8), pady=(12, 0))
+
+        self.status_pill = ctk.CTkLabel(card, text='', text_color="white", corner_radius=14, padx=12, pady=5, font=("Segoe UI", 11))
+        self.status_pill.grid(row=0, column=3, sticky='e', padx=(8, 14), pady=(12, 0))
+        self.status_pill.bind('<Button-1>', lambda e: app._toggle_enabled_by_index(self.idx))
+
+        # Riga 1: Orario a sinistra, Azione a destra
+        self.time_lbl = ctk.CTkLabel(card, text='', text_color=MUTED_TEXT, font=("Segoe UI", 12))
+        self.time_lbl.grid(row=1, column=1, sticky='w', padx=(8, 8), pady=(4, 8))
+
+        self.action_lbl = ctk.CTkLabel(card, text='', fg_color="#0f0f0f", text_color=TEXT_COLOR, corner_radius=12, padx=12, pady=5, font=("Segoe UI", 11))
+        self.action_lbl.grid(row=1, column=3, sticky='e', padx=(8, 14), pady=(4, 8))
+
+        # Divider sottile
+        divider = ctk.CTkFrame(card, height=1, fg_color=CARD_BORDER)
+        divider.grid(row=2, column=0, columnspan=4, sticky='ew', padx=12, pady=(0, 8))
+
+        # Riga 3: Giorni (pills intelligenti), al massimo una per giorno
+        self.days_row = ctk.CTkFrame(card, fg_color="transparent")
+        self.days_row.grid(row=3, column=0, columnspan=4, sticky='w', padx=12, pady=(0, 12))
+        self.day_pills = [
+            ctk.CTkLabel(self.days_row, text='', fg_color="#1e1e1e", text_color=TEXT_COLOR, corner_radius=12, padx=10, pady=3, font=("Segoe UI", 11))
+            for _ in range(7)
+        ]
+        self.shown_pills = 0
+
+        # Hover/Selezione
+        card.bind('<Enter>', self._on_enter)
+        card.bind('<Leave>', self._on_leave)
+        # Binding per selezione/doppio click: leggono l'indice corrente della card
+        for w in (card, self.icon_chip, self.title, self.time_lbl, self.days_row, self.action_lbl, self.status_pill):
+            try:
+                w.bind('<Button-1>', lambda e: app._select_card(self.idx))
+                w.bind('<Double-Button-1>', lambda e: app._on_card_double_click(self.idx))
+            except Exception:
+                pass
+
+        self.item = canvas.create_window(0, 0, window=card, anchor='nw', state='hidden')
+
+    def bind(self, idx, s, selected):
+        self.idx = idx
+        self.key = card_key(s)
+        is_shutdown = (s.action == 'shutdown')
+        enabled = s.enabled
+        texts = day_pill_texts(s.day_mask, self.view.app._get_day_name)
+        if self._changed('action', is_shutdown):
+            self.icon_chip.configure(text='⏻' if is_shutdown else '☾')
+            self.title.configure(text="Spegni" if is_shutdown else "Ibernazione")
+            self.action_lbl.configure(text="Shutdown" if is_shutdown else "Ibernazione")
+        if self._changed('enabled', enabled):
+            self.status_pill.configure(text="ON" if enabled else "OFF", fg_color="#1f874a" if enabled else "#555555")
+        if self._changed('time', s.minute):
+            self.time_lbl.configure(text=s.time)
+        if self._changed('days', texts):
+            for pill, text in zip(self.day_pills, texts):
+                pill.configure(text=text)
+            if len(texts) != self.shown_pills:
+                for pill in self.day_pills[:self.shown_pills]:
+                    pill.pack_forget()
+                for pill in self.day_pills[:len(texts)]:
+                    pill.pack(side='left', padx=4)
+                self.shown_pills = len(texts)
+        self.set_selected(selected)
+
+    def _changed(self, field, value):
+        if self.shown.get(field, self) == value:
+            return False
+        self.shown[field] = value
+        return True
+
+    def set_selected(self, selected):
+        if not self._changed('selected', selected):
+            return
+        if selected:
+            self.frame.configure(fg_color=CARD_BG_SELECTED, border_color=ACCENT_COLOR)
+        else:
+            self.frame.configure(fg_color=CARD_BG, border_color=CARD_BORDER)
+
+    def place(self, y, width, height):
+        canvas = self.view.canvas
+        canvas.coords(self.item, CARD_PADX, y)
+        canvas.itemconfigure(self.item, width=max(1, width - 2 * CARD_PADX), height=height, state='normal')
+
+    def hide(self):
+        self.idx = None
+        self.key = None
+        self.view.canvas.itemconfigure(self.item, state='hidden')
+
+    def _on_enter(self, event=None):
+        if self.view.selected != self.idx:
+            self.frame.configure(fg_color=CARD_BG_HOVER)
+
+    def _on_leave(self, event=None):
+        if self.view.selected != self.idx:
+            self.frame.configure(fg_color=CARD_BG)
+
+class _VirtualList:
+    """Base comune delle viste: slot ad altezza fissa, scrollregion e area visibile."""
+
+    def __init__(self, app, canvas, scrollbar):
+        self.app = app
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.schedules = []
+        # Riga -> indice della regola mostrata e il suo inverso
+        self.order = []
+        self.rows = []
+        self.selected = None
+        self.width = 1
+        scrollbar.configure(command=self.yview)
+        canvas.configure(yscrollcommand=self._on_yscroll, yscrollincrement=CARD_GAP)
+        canvas.bind('<Configure>', self._on_configure)
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+
+    def _set_data(self, schedules, order):
+        self.schedules = schedules
+        self.order = list(order) if order is not None else list(range(len(schedules)))
+        self.rows = [0] * len(self.order)
+        for row, idx in enumerate(self.order):
+            self.rows[idx] = row
+        if self.selected is not None and not (0 <= self.selected < len(schedules)):
+            self.selected = None
+
+    def slot_height(self):
+        return int((CARD_HEIGHT + CARD_GAP) * self._scaling())
+
+    def _visible_range(self, slot):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // slot) - OVERSCAN)
+        last = min(len(self.schedules), int(bottom // slot) + 1 + OVERSCAN)
+        return first, last
+
+    def _update_scrollregion(self):
+        height = len(self.schedules) * self.slot_height()
+        self.canvas.configure(scrollregion=(0, 0, self.width, max(height, 1)))
+
+    def _on_configure(self, event):
+        self.width = event.width
+        self._update_scrollregion()
+        self.refresh()
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def _scaling(self):
+        try:
+            return ctk.ScalingTracker.get_widget_scaling(self.canvas)
+        except Exception:
+            return 1.0
+
+class CardListView(_VirtualList):
+    """Lista virtualizzata delle regole con card CustomTkinter riciclate."""
+
+    def __init__(self, app, canvas, scrollbar):
+        super().__init__(app, canvas, scrollbar)
+        self.visible = {}  # indice regola -> _Card in uso
+        self.free = []     # card del pool non assegnate
+
+    def set_schedules(self, schedules, order=None):
+        """Mostra `schedules` (nell'ordine di indici `order`, se dato) aggiornando solo
+        le card visibili che differiscono."""
+        self._set_data(schedules, order)
+        # Card attualmente in uso, per regola: una regola spostata riusa la propria card
+        by_key = {card.key: card for card in self.visible.values()}
+        self.visible = {}
+        self._update_scrollregion()
+        self.refresh(by_key)
+        for card in by_key.values():
+            card.hide()
+            self.free.append(card)
+
+    def set_selected(self, idx):
+        prev = self.visible.get(self.selected)
+        if prev is not None:
+            prev.set_selected(False)
+        self.selected = idx
+        card = self.visible.get(idx)
+        if card is not None:
+            card.set_selected(True)
+
+    def refresh(self, by_key=None):
+        """Allinea le card costruite all'area visibile del canvas.
+
+        `by_key` contiene card da riassegnare preferibilmente alla stessa regola
+        (dopo un cambio dei dati); vengono rimosse dal dizionario quando riusate.
+        """
+        slot = self.slot_height()
+        first, last = self._visible_range(slot)
+        for idx in list(self.visible):
+            if not (first <= self.rows[idx] < last):
+                self._release(idx)
+        spare = []
+        if by_key:
+            # Prima le regole che avevano gia' una card; le card avanzate (es. dopo
+            # un cambio di ordinamento) vengono riusate per le altre
+            for row in range(first, last):
+                idx = self.order[row]
+                card = by_key.pop(card_key(self.schedules[idx]), None)
+                if card is not None:
+                    self.visible[idx] = card
+            spare = list(by_key.values())
+            by_key.clear()
+        gap = int(CARD_GAP / 2 * self._scaling())
+        for row in range(first, last):
+            idx = self.order[row]
+            s = self.schedules[idx]
+            card = self.visible.get(idx)
+            if card is None:
+                if spare:
+                    card = spare.pop()
+                else:
+                    card = self.free.pop() if self.free else _Card(self)
+                self.visible[idx] = card
+            if by_key is not None or card.idx != idx:
+                card.bind(idx, s, idx == self.selected)
+            card.place(row * slot + gap, self.width, slot - 2 * gap)
+        for card in spare:
+            card.hide()
+            self.free.append(card)
+
+    def _release(self, idx):
+        card = self.visible.pop(idx)
+        card.hide()
+        self.free.append(card)
+
+def rounded_rect(canvas, x1, y1, x2, y2, r, **kwargs):
+    """Rettangolo arrotondato come poligono smussato (un solo item del canvas)."""
+    r = max(1, min(r, (x2 - x1) / 2, (y2 - y1) / 2))
+    points = (
+        x1 + r, y1, x2 - r, y1, x2, y1, x2, y1 + r,
+        x2, y2 - r, x2, y2, x2 - r, y2, x1 + r, y2,
+        x1, y2, x1, y2 - r, x1, y1 + r, x1, y1,
+    )
+    return canvas.create_polygon(points, smooth=True, **kwargs)
+
+class CanvasCardListView(_VirtualList):
+    """Motore alternativo: le card sono item disegnati direttamente sul canvas.
+
+    Nessun widget per card (solo rettangoli arrotondati e testi); selezione,
+    doppio click e toggle ON/OFF passano dall'hit-testing sulle coordinate.
+    Come la vista a widget disegna solo le card visibili e ridisegna solo
+    quelle i cui dati sono cambiati.
+    """
+
+    def __init__(self, app, canvas, scrollbar):
+        super().__init__(app, canvas, scrollbar)
+        self.drawn = {}  # indice regola -> (stato disegnato, id item sfondo)
+        self.hover = None
+        self._fonts = None
+        self._text_widths = {}
+        canvas.bind('<Button-1>', self._on_click)
+        canvas.bind('<Double-Button-1>', self._on_double_click)
+        canvas.bind('<Motion>', self._on_motion)
+        canvas.bind('<Leave>', lambda e: self._set_hover(None))
+
+    def set_schedules(self, schedules, order=None):
+        self._set_data(schedules, order)
+        self._update_scrollregion()
+        self.refresh()
+
+    def set_selected(self, idx):
+        prev = self.selected
+        self.selected = idx
+        for i in (prev, idx):
+            self._paint_background(i)
+
+    def refresh(self):
+        slot = self.slot_height()
+        first, last = self._visible_range(slot)
+        for idx in list(self.drawn):
+            if idx >= len(self.rows) or not (first <= self.rows[idx] < last):
+                self._erase(idx)
+        for row in range(first, last):
+            idx = self.order[row]
+            state = self._card_state(self.schedules[idx], row, slot)
+            drawn = self.drawn.get(idx)
+            if drawn is not None:
+                if drawn[0] == state:
+                    continue
+                old_row = drawn[0][-2]
+                if drawn[0][:-2] == state[:-2] and drawn[0][-1] == slot:
+                    # Stessa card in un'altra riga (riordino): sposta gli item
+                    self.canvas.move(f"card{idx}", 0, (row - old_row) * slot)
+                    self.drawn[idx] = (state, drawn[1])
+                    continue
+            self._erase(idx)
+            self._draw(idx, state, slot)
+
+    def _card_state(self, s, row, slot):
+        # Tutto cio' che determina l'aspetto della card (posizione, larghezza e scala comprese)
+        return (
+            s.action == 'shutdown',
+            s.enabled,
+            s.time,
+            tuple(day_pill_texts(s.day_mask, self.app._get_day_name)),
+            self.width,
+            row,
+            slot,
+        )
+
+    def _erase(self, idx):
+        if self.drawn.pop(idx, None) is not None:
+            self.canvas.delete(f"card{idx}")
+
+    def _draw(self, idx, state, slot):
+        is_shutdown, enabled, time_text, day_texts, width, row, _ = state
+        canvas = self.canvas
+        k = self._scaling()
+        title_font, body_font, pill_font = self._get_fonts(k)
+        tags = ("card", f"card{idx}")
+        gap = int(CARD_GAP / 2 * k)
+        x1, y1 = CARD_PADX, row * slot + gap
+        x2, y2 = max(x1 + 1, width - CARD_PADX), (row + 1) * slot - gap
+
+        bg = rounded_rect(canvas, x1, y1, x2, y2, 12 * k, fill=CARD_BG, outline=CARD_BORDER, width=1, tags=tags)
+        # Icon chip
+        cx, cy = x1 + 27 * k, y1 + 27 * k
+        canvas.create_oval(cx - 15 * k, cy - 15 * k, cx + 15 * k, cy + 15 * k, fill="#1e1e1e", outline="", tags=tags)
+        canvas.create_text(cx, cy, text='⏻' if is_shutdown else '☾', fill=TEXT_COLOR, font=body_font, tags=tags)
+        # Titolo e orario
+        canvas.create_text(x1 + 58 * k, y1 + 26 * k, text="Spegni" if is_shutdown else "Ibernazione",
+                           anchor='w', fill=TEXT_COLOR, font=title_font, tags=tags)
+        canvas.create_text(x1 + 58 * k, y1 + 58 * k, text=time_text, anchor='w', fill=MUTED_TEXT, font=body_font, tags=tags)
+        # Pill di stato (cliccabile) e azione, allineate a destra
+        self._pill(x2 - 14 * k, y1 + 26 * k, "ON" if enabled else "OFF", "#1f874a" if enabled else "#555555",
+                   "white", pill_font, k, tags + ("pill",), anchor='e')
+        self._pill(x2 - 14 * k, y1 + 58 * k, "Shutdown" if is_shutdown else "Ibernazione", "#0f0f0f",
+                   TEXT_COLOR, pill_font, k, tags, anchor='e')
+        # Divider e giorni
+        canvas.create_line(x1 + 12 * k, y1 + 80 * k, x2 - 12 * k, y1 + 80 * k, fill=CARD_BORDER, tags=tags)
+        px = x1 + 16 * k
+        for text in day_texts:
+            px = self._pill(px, y1 + 102 * k, text, "#1e1e1e", TEXT_COLOR, pill_font, k, tags) + 8 * k
+
+        self.drawn[idx] = (state, bg)
+        self._paint_background(idx)
+
+    def _pill(self, x, cy, text, fill, text_color, font, k, tags, anchor='w'):
+        """Disegna una pill; ritorna la coordinata x del bordo opposto ad `anchor`."""
+        w = self._measure(font, text) + 22 * k
+        h = 24 * k
+        x1, x2 = (x - w, x) if anchor == 'e' else (x, x + w)
+        rounded_rect(self.canvas, x1, cy - h / 2, x2, cy + h / 2, h / 2, fill=fill, outline="", tags=tags)
+        self.canvas.create_text((x1 + x2) / 2, cy, text=text, fill=text_color, font=font, tags=tags)
+        return x1 if anchor == 'e' else x2
+
+    def _paint_background(self, idx):
+        drawn = self.drawn.get(idx)
+        if idx is None or drawn is None:
+            return
+        if idx == self.selected:
+            fill, outline = CARD_BG_SELECTED, ACCENT_COLOR
+        elif idx == self.hover:
+            fill, outline = CARD_BG_HOVER, CARD_BORDER
+        else:
+            fill, outline = CARD_BG, CARD_BORDER
+        self.canvas.itemconfigure(drawn[1], fill=fill, outline=outline)
+
+    def _get_fonts(self, k):
+        if self._fonts is None or self._fonts[0] != k:
+            from tkinter import font as tkfont
+            # Dimensioni negative = pixel, come fa CustomTkinter con la scala dei widget
+            self._fonts = (k, (
+                tkfont.Font(family="Segoe UI", size=-round(16 * k), weight="bold"),
+                tkfont.Font(family="Segoe UI", size=-round(12 * k)),
+                tkfont.Font(family="Segoe UI", size=-round(11 * k)),
+            ))
+            self._text_widths = {}
+        return self._fonts[1]
+
+    def _measure(self, font, text):
+        key = (str(font), text)
+        width = self._text_widths.get(key)
+        if width is None:
+            width = self._text_widths[key] = font.measure(text)
+        return width
+
+    def _hit(self, event):
+        """Indice della card sotto il puntatore (None se nello spazio tra le card)."""
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        slot = self.slot_height()
+        row = int(y // slot)
+        gap = CARD_GAP / 2 * self._scaling()
+        if not (0 <= row < len(self.order)) or not (CARD_PADX <= x <= self.width - CARD_PADX):
+            return None
+        if not (row * slot + gap <= y <= (row + 1) * slot - gap):
+            return None
+        return self.order[row]
+
+    def _on_click(self, event):
+        idx = self._hit(event)
+        if idx is None:
+            return
+        self.app._select_card(idx)
+        if "pill" in self.canvas.gettags("current"):
+            self.app._toggle_enabled_by_index(idx)
+
+    def _on_double_click(self, event):
+        idx = self._hit(event)
+        if idx is not None:
+            self.app._on_card_double_click(idx)
+
+    def _on_motion(self, event):
+        self._set_hover(self._hit(event))
+
+    def _set_hover(self, idx):
+        if idx == self.hover:
+            return
+        prev, self.hover = self.hover, idx
+        for i in (prev, idx):
+            self._paint_background(i)
+
+RENDER_ENGINES = {
+    'widgets': CardListView,
+    'canvas': CanvasCardListView,
+}
+
+def create_card_view(engine, app, canvas, scrollbar):
+    """Vista delle card per il motore configurato (`render_engine`), widget come default."""
+    return RENDER_ENGINES.get(engine, CardListView)(app, canvas, scrollbar)
@@ -0,0 +1,238 @@
+"""
+Configurazione persistente (regole e preferenze) in formato JSON.
+
+Le scritture sono atomiche (file temporaneo, fsync, rename). `ConfigWriter`
+le sposta su un thread in background e accorpa le modifiche ravvicinate in
+un'unica scrittura.
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import collections
+from pathlib import Path
+
+from .metrics import SAVE_SECONDS
+from .model import Schedule
+from .schema import SCHEMA_VERSION, migrate_config, validate_config
+
+APP_NAME = "ShutdownScheduler"
+
+def _default_config_dir():
+    # %APPDATA% su Windows; altrove (test, CI, modalita' headless) la cartella utente.
+    # SHUTDOWN_SCHEDULER_CONFIG_DIR permette di puntare a una configurazione diversa.
+    override = os.getenv('SHUTDOWN_SCHEDULER_CONFIG_DIR')
+    if override:
+        return Path(override)
+    base = os.getenv('APPDATA')
+    return Path(base) / APP_NAME if base else Path.home() / ".config" / APP_NAME
+
+CONFIG_DIR = _default_config_dir()
+CONFIG_FILE = CONFIG_DIR / "config.json"
+
+DEFAULT_CONFIG = {
+    "schema_version": SCHEMA_VERSION,
+    "schedules": [],
+    "autostart": True,
+    "theme": "dark",  # Nuovo campo per salvare il tema preferito
+    "ui_scale": 1.0,    # Fattore di scala UI (1.0 = 100%)
+    "render_engine": "widgets",  # Motore delle card: "widgets" (CustomTkinter) o "canvas"
+    "action_backend": "auto",  # "auto", "windows", "systemd" o "dry-run" (vedi actions.py)
+    "conflict_window": 5,  # Minuti: al massimo un'azione per finestra, vince la priorita' piu' alta
+    "metrics_textfile": "",  # File .prom per il textfile collector di node-exporter ("" = disattivato)
+    "metrics_interval": 15,  # Secondi tra due scritture del file delle metriche
+    "metrics_port": 0  # Porta dell'endpoint /metrics su 127.0.0.1 (0 = disattivato)
+}
+
+def parse_config(text):
+    """Interpreta il JSON della configurazione; ValueError se non e' utilizzabile.
+
+    Applica le migrazioni di schema e valida le regole una volta sola: le regole
+    scartate vengono segnalate e conservate in `invalid_schedules`, quelle valide
+    diventano oggetti `Schedule`.
+    """
+    cfg = json.loads(text)
+    if not isinstance(cfg, dict):
+        raise ValueError("la configurazione deve essere un oggetto JSON")
+    if not isinstance(cfg.get('schedules', []), list):
+        raise ValueError("'schedules' deve essere una lista")
+    cfg = migrate_config(cfg)
+    cfg, problems = validate_config(cfg)
+    for problem in problems:
+        print('Valore non valido ignorato:', problem)
+    cfg['schedules'] = [Schedule.from_dict(rule) for rule in cfg['schedules']]
+    # Assicurati che la configurazione abbia tutti i campi necessari
+    for key, value in DEFAULT_CONFIG.items():
+        if key not in cfg:
+            cfg[key] = copy.deepcopy(value)
+    return cfg
+
+def read_config(path=None):
+    """Come `load_config` ma senza ripiego: OSError/ValueError se il file esiste e non e' leggibile.
+
+    Da usare quando la config verra' riscritta (es. import da riga di comando), per non
+    sostituire un file danneggiato con i valori di default.
+    """
+    path = Path(path or CONFIG_FILE)
+    if not path.exists():
+        return copy.deepcopy(DEFAULT_CONFIG)
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_config(f.read())
+
+def load_config(path=None):
+    path = Path(path or CONFIG_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        return read_config(path)
+    except Exception as e:
+        print('Errore caricamento configurazione:', e)
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+def content_digest(data):
+    """Impronta del contenuto del file (bytes o testo), per riconoscere le proprie scritture."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+def _write_atomic(path, text):
+    # Un crash durante la scrittura lascia intatto il file precedente
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def _to_json(obj):
+    if isinstance(obj, Schedule):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} non serializzabile")
+
+def _serialize(cfg):
+    return json.dumps(cfg, indent=2, ensure_ascii=False, default=_to_json)
+
+def snapshot_config(cfg):
+    """Copia della config sufficiente per serializzarla mentre l'originale cambia.
+
+    Le regole sono immutabili: basta copiare la lista.
+    """
+    snap = dict(cfg)
+    snap['schedules'] = list(cfg.get('schedules', []))
+    return snap
+
+def save_config(cfg, path=None):
+    """Scrive la config in modo atomico; ritorna l'impronta del contenuto scritto."""
+    with SAVE_SECONDS.time():
+        text = _serialize(cfg)
+        _write_atomic(path or CONFIG_FILE, text)
+    return content_digest(text)
+
+class ConfigWriter:
+    """Salvataggio write-behind: `schedule()` e' immediato, la scrittura avviene dopo
+    `debounce` secondi di quiete (al massimo `max_delay` dalla prima modifica)."""
+
+    def __init__(self, path=None, debounce=0.4, max_delay=2.0):
+        self.path = Path(path or CONFIG_FILE)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._pending = None       # ultima snapshot da scrivere
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._writing = False
+        self._stopped = False
+        # Impronte delle ultime scritture: il watcher non le tratta come modifiche esterne
+        self._written = collections.deque(maxlen=8)
+        self._thread = threading.Thread(target=self._run, name="ConfigWriter", daemon=True)
+        self._thread.start()
+
+    def schedule(self, cfg):
+        snap = snapshot_config(cfg)
+        with self._cond:
+            now = time.monotonic()
+            if self._pending is None:
+                self._first_change = now
+            self._pending = snap
+            self._last_change = now
+            self._cond.notify_all()
+
+    def rebase(self, cfg):
+        """Config ricaricata da disco: una scrittura in sospeso o in corso (stato ormai
+        superato) viene sostituita da `cfg`, cosi' non annulla la modifica esterna.
+
+        Ritorna True se c'era qualcosa da sostituire (il file verra' riscritto con `cfg`).
+        """
+        snap = snapshot_config(cfg)
+        with self._cond:
+            if self._pending is None and not self._writing:
+                return False
+            now = time.monotonic()
+            self._pending = snap
+            self._first_change = self._last_change = now
+            self._cond.notify_all()
+            return True
+
+    def is_own_write(self, digest):
+        return digest in self._written
+
+    def flush(self, timeout=5.0):
+        """Scrive subito le modifiche in sospeso e attende la fine della scrittura."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._first_change = self._last_change = float('-inf')
+            self._cond.notify_all()
+            while self._pending is not None or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=5.0):
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._pending is not None:
+                        now = time.monotonic()
+                        due = min(self._last_change + self.debounce, self._first_change + self.max_delay)
+                        if now >= due:
+                            break
+                        self._cond.wait(due - now)
+                    else:
+                        self._cond.wait()
+                if self._stopped and self._pending is None:
+                    return
+                snap, self._pending = self._pending, None
+                self._writing = True
+            try:
+                with SAVE_SECONDS.time():
+                    text = _serialize(snap)
+                    # Registrata prima del rename: il watcher puo' vedere il file subito dopo
+                    self._written.append(content_digest(text))
+                    _write_atomic(self.path, text)
+            except Exception as e:
+                print('Errore salvataggio configurazione:', e)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
@@ -0,0 +1,105 @@
+"""
+Indice dei conflitti: regole attive che scattano nello stesso minuto o a pochi
+minuti di distanza (entro `conflict_window`), segnalate al salvataggio.
+
+Ogni occorrenza settimanale di una regola abilitata e' un punto
+`(minuto della settimana, uid)` in una lista ordinata, aggiornata con `bisect`
+a ogni modifica: la ricerca dei vicini di una regola costa O(giorni x log n)
+e tiene conto del passaggio domenica -> lunedi'.
+L'esecuzione (una sola azione per finestra) e' decisa dallo scheduler.
+"""
+
+import bisect
+
+from .engine import MINUTES_PER_DAY, MINUTES_PER_WEEK
+
+def _occurrences(s):
+    mask = s.day_mask
+    day = 0
+    while mask:
+        if mask & 1:
+            yield day * MINUTES_PER_DAY + s.minute
+        mask >>= 1
+        day += 1
+
+class Conflict:
+    """Regola `uid` a `distance` minuti (0 = stesso minuto) da quella controllata."""
+
+    __slots__ = ('uid', 'distance', 'priority', 'action', 'time')
+
+    def __init__(self, uid, distance, other):
+        self.uid = uid
+        self.distance = distance
+        self.priority = other.priority
+        self.action = other.action
+        self.time = other.time
+
+    @property
+    def collision(self):
+        return self.distance == 0
+
+    def __repr__(self):
+        return f"Conflict(uid={self.uid}, distance={self.distance}, {self.action} {self.time})"
+
+class ConflictIndex:
+    """Occorrenze settimanali delle regole abilitate, ordinate per minuto della settimana."""
+
+    def __init__(self, schedules=()):
+        self._points = []  # (minuto della settimana, uid), ordinata
+        self._rules = {}   # uid -> Schedule indicizzata
+        self.reset(schedules)
+
+    def reset(self, schedules):
+        self._rules = {s.uid: s for s in schedules if s.enabled}
+        self._points = sorted((m, s.uid) for s in self._rules.values() for m in _occurrences(s))
+
+    def add(self, s):
+        if not s.enabled:
+            return
+        self._rules[s.uid] = s
+        for m in _occurrences(s):
+            bisect.insort(self._points, (m, s.uid))
+
+    def remove(self, s):
+        if self._rules.pop(s.uid, None) is None:
+            return
+        for m in _occurrences(s):
+            pos = bisect.bisect_left(self._points, (m, s.uid))
+            if pos < len(self._points) and self._points[pos] == (m, s.uid):
+                del self._points[pos]
+
+    def replace(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+    def _near(self, minute, window):
+        # Punti in [minute - window, minute + window], anche a cavallo della fine settimana
+        lo, hi = minute - window, minute + window
+        for start, end, shift in ((lo, hi, 0), (lo + MINUTES_PER_WEEK, hi + MINUTES_PER_WEEK, MINUTES_PER_WEEK),
+                                  (lo - MINUTES_PER_WEEK, hi - MINUTES_PER_WEEK, -MINUTES_PER_WEEK)):
+            a = bisect.bisect_left(self._points, (max(start, 0), 0))
+            b = bisect.bisect_left(self._points, (min(end, MINUTES_PER_WEEK - 1) + 1, 0))
+            for m, uid in self._points[a:b]:
+                yield m - shift, uid
+
+    def conflicts(self, s, window, ignore_uid=None):
+        """Regole abilitate entro `window` minuti da `s`, ordinate per distanza.
+
+        Per ogni regola conta l'occorrenza piu' vicina; una regola disabilitata non
+        ha conflitti. `ignore_uid` esclude la regola in modifica.
+        """
+        if not s.enabled:
+            return []
+        # Oltre mezza settimana la finestra coprirebbe comunque tutte le occorrenze
+        window = min(window, MINUTES_PER_WEEK // 2 - 1)
+        nearest = {}
+        for minute in _occurrences(s):
+            for m, uid in self._near(minute, window):
+                if uid == ignore_uid or uid == s.uid:
+                    continue
+                distance = abs(m - minute)
+                if distance < nearest.get(uid, window + 1):
+                    nearest[uid] = distance
+        found = [Conflict(uid, distance, self._rules[uid]) for uid, distance in nearest.items()]
+        found.sort(key=lambda c: (c.distance, -c.priority))
+        return found
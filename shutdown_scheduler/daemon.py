@@ -0,0 +1,108 @@
+"""
+Modalita' headless: solo configurazione, motore di scheduling e ricaricamento a
+caldo, senza Tk/CustomTkinter/PIL/pystray (memoria residente minima per le
+macchine che non aprono mai la GUI).
+
+SIGINT/SIGTERM (e SIGBREAK su Windows) fermano il processo in modo pulito;
+SIGHUP, dove esiste, rilegge la configurazione.
+"""
+
+import signal
+import threading
+
+from .actions import ActionExecutor, create_backend
+from .config import CONFIG_FILE, load_config, read_config
+from .engine import SchedulerThread
+from .metrics import start_exporters, stop_exporters
+from .watcher import ConfigWatcher
+
+# Intervallo di attesa del thread principale: su Windows i segnali (Ctrl+C)
+# vengono gestiti solo quando il thread principale si risveglia
+_MAIN_WAIT_SECONDS = 1.0
+
+class HeadlessService:
+    """Scheduler e watcher della configurazione, senza interfaccia."""
+
+    def __init__(self, config_file=CONFIG_FILE, action_backend=None):
+        self.config_file = config_file
+        self.action_backend = action_backend
+        self.stop_event = threading.Event()
+        self.scheduler = None
+        self.config_watcher = None
+        self.exporters = []
+
+    def start(self):
+        cfg = load_config(self.config_file)
+        executor = ActionExecutor(create_backend(self.action_backend or cfg.get('action_backend')))
+        self.scheduler = SchedulerThread(self.stop_event, schedules=cfg['schedules'], executor=executor,
+                                         conflict_window=cfg['conflict_window'])
+        self.scheduler.start()
+        # Stesso percorso della GUI: le modifiche su disco arrivano gia' validate
+        self.config_watcher = ConfigWatcher(self.config_file, self._apply_config)
+        self.config_watcher.start()
+        # Metriche (file .prom e/o /metrics su localhost), se abilitate in config
+        self.exporters = start_exporters(cfg)
+        print(f"Scheduler avviato in modalita' headless: {len(cfg['schedules'])} regole ({self.config_file}), "
+              f"azioni via {executor.backend.name}")
+        self._print_next()
+
+    def reload(self):
+        print('Ricarico la configurazione')
+        try:
+            cfg = read_config(self.config_file)
+        except Exception as e:
+            # File illeggibile: restano attive le regole correnti, non quelle di default
+            print('Errore caricamento configurazione:', e)
+            return
+        self._apply_config(cfg)
+
+    def _apply_config(self, cfg):
+        self.scheduler.publish(cfg['schedules'], cfg['conflict_window'])
+        self._print_next()
+
+    def _print_next(self):
+        events = self.scheduler.upcoming(1)
+        if events:
+            when, s = events[0]
+            print(f"Prossima esecuzione: {s.action} il {when:%Y-%m-%d %H:%M}")
+        else:
+            print('Nessuna esecuzione pianificata')
+
+    def stop(self):
+        self.stop_event.set()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+
+    def wait(self):
+        while not self.stop_event.wait(_MAIN_WAIT_SECONDS):
+            pass
+        if self.scheduler is not None:
+            self.scheduler.join(timeout=5.0)
+            self.scheduler.executor.shutdown(wait=False)
+        if self.config_watcher is not None:
+            self.config_watcher.join(timeout=5.0)
+        # Ultima scrittura del file delle metriche dopo l'arresto dello scheduler
+        stop_exporters(self.exporters)
+
+def _install_signal_handlers(service):
+    def _on_stop(signum, frame):
+        print(f"Segnale {signum} ricevuto: arresto dello scheduler")
+        service.stop()
+
+    for name in ('SIGINT', 'SIGTERM', 'SIGBREAK'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _on_stop)
+    if hasattr(signal, 'SIGHUP'):
+        # Ricarica fuori dal gestore del segnale (che gira nel thread principale)
+        signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(target=service.reload, daemon=True).start())
+
+def run_headless(action_backend=None):
+    """Avvia lo scheduler senza GUI e resta in attesa fino a un segnale di arresto."""
+    service = HeadlessService(action_backend=action_backend)
+    _install_signal_handlers(service)
+    service.start()
+    service.wait()
+    print('Scheduler arrestato')
+    return 0
@@ -0,0 +1,57 @@
+"""
+Indice dei duplicati: controllo O(1) all'inserimento e alla modifica delle regole.
+
+Ogni regola ha una chiave canonica (maschera dei giorni, minuto del giorno, azione):
+due regole con la stessa chiave sono identiche ai fini dello scheduling. Un secondo
+indice per (minuto, azione) trova i giorni in cui una regola si sovrappone ad altre
+alla stessa ora e con la stessa azione (quasi duplicate, segnalate all'utente).
+"""
+
+class DuplicateIndex:
+    """Indici hash delle regole per `uid`, da aggiornare a ogni modifica della lista."""
+
+    def __init__(self, schedules=()):
+        self._by_key = {}   # slot_key -> {uid}
+        self._by_time = {}  # (minuto, azione) -> {uid: maschera giorni}
+        self.reset(schedules)
+
+    def reset(self, schedules):
+        self._by_key = {}
+        self._by_time = {}
+        for s in schedules:
+            self.add(s)
+
+    def add(self, s):
+        self._by_key.setdefault(s.slot_key, set()).add(s.uid)
+        self._by_time.setdefault((s.minute, s.action), {})[s.uid] = s.day_mask
+
+    def remove(self, s):
+        uids = self._by_key.get(s.slot_key)
+        if uids is not None:
+            uids.discard(s.uid)
+            if not uids:
+                del self._by_key[s.slot_key]
+        masks = self._by_time.get((s.minute, s.action))
+        if masks is not None:
+            masks.pop(s.uid, None)
+            if not masks:
+                del self._by_time[(s.minute, s.action)]
+
+    def replace(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+    def find_duplicate(self, s, ignore_uid=None):
+        """uid di una regola identica a `s` (diversa da `ignore_uid`), altrimenti None."""
+        for uid in self._by_key.get(s.slot_key, ()):
+            if uid != ignore_uid:
+                return uid
+        return None
+
+    def overlap_mask(self, s, ignore_uid=None):
+        """Giorni (maschera) in cui `s` si sovrappone ad altre regole con stessa ora e azione."""
+        mask = 0
+        for uid, other in self._by_time.get((s.minute, s.action), {}).items():
+            if uid != ignore_uid:
+                mask |= other & s.day_mask
+        return mask
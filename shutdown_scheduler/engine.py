@@ -0,0 +1,389 @@
+"""
+Motore di scheduling: indice minute-of-week delle regole e thread che attende
+la prossima scadenza. Nessuna dipendenza da GUI o registro di sistema.
+"""
+
+import time
+import bisect
+import itertools
+import collections
+import threading
+import datetime
+
+from .actions import ActionExecutor
+from .metrics import EVALUATION_SECONDS, FIRE_LATENCY, MISSED, NEXT_FIRE, RULES, SUPPRESSED, WAKEUPS
+
+# Attesa massima tra due risvegli dello scheduler: anche senza scadenze vicine
+# il thread si riallinea periodicamente all'orologio di sistema
+MAX_WAIT_SECONDS = 60.0
+# Ritardo massimo tollerato rispetto al minuto pianificato per eseguire l'azione
+FIRE_GRACE_SECONDS = 60.0
+# Scarto tra orologio di sistema e tempo monotono oltre il quale si assume un salto
+# (ibernazione/sospensione, correzione NTP, cambio ora legale)
+CLOCK_JUMP_SECONDS = 5.0
+# Oltre questo intervallo le scadenze mancate non vengono piu' recuperate
+MISSED_LOOKBACK = datetime.timedelta(days=7)
+
+# Politiche per le regole il cui minuto e' passato mentre lo scheduler non girava
+MISSED_SKIP = 'skip'            # ignora (comportamento predefinito)
+MISSED_FIRE_ONCE = 'fire_once'  # esegui una volta al ripristino
+MISSED_WITHIN = 'within'        # esegui solo se il ritardo e' entro `missed_window` minuti
+MISSED_POLICIES = (MISSED_SKIP, MISSED_FIRE_ONCE, MISSED_WITHIN)
+DEFAULT_MISSED_WINDOW = 15
+# Minuti entro cui due azioni sono in conflitto: ne viene eseguita una sola
+DEFAULT_CONFLICT_WINDOW = 5
+
+# Prossime esecuzioni calcolate (e tenute in cache) per pannello e tooltip
+UPCOMING_COUNT = 5
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY  # 10.080 slot, uno per minuto della settimana
+
+def minute_of_week(moment):
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def next_minute(moment):
+    """Inizio del primo minuto successivo a `moment` (mai il minuto in corso)."""
+    return moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+
+class ScheduleIndex:
+    """Regole attive compilate in una tabella minute-of-week -> indici delle regole.
+
+    La tabella va ricostruita solo quando cambiano le regole: il match di un
+    minuto e' una singola lookup, la prossima scadenza una ricerca binaria sugli slot occupati.
+    """
+
+    __slots__ = ('slots', 'minutes')
+
+    def __init__(self, schedules):
+        slots = [()] * MINUTES_PER_WEEK
+        # Regole `Schedule`: giorni come maschera a 7 bit, orario come minuto del giorno
+        for idx, s in enumerate(schedules):
+            if not s.enabled:
+                continue
+            mask = s.day_mask
+            slot = s.minute
+            while mask:
+                if mask & 1:
+                    slots[slot] = slots[slot] + (idx,)
+                mask >>= 1
+                slot += MINUTES_PER_DAY
+        self.slots = slots
+        self.minutes = [m for m, rules in enumerate(slots) if rules]
+
+    def rules_at(self, moment):
+        """Indici delle regole che scattano nel minuto di `moment`."""
+        return self.slots[minute_of_week(moment)]
+
+    def next_fire(self, after):
+        """Primo minuto pianificato >= minuto di `after`, None se non ci sono regole attive."""
+        if not self.minutes:
+            return None
+        base = after.replace(second=0, microsecond=0)
+        current = minute_of_week(base)
+        pos = bisect.bisect_left(self.minutes, current)
+        if pos < len(self.minutes):
+            offset = self.minutes[pos] - current
+        else:
+            offset = self.minutes[0] + MINUTES_PER_WEEK - current
+        return base + datetime.timedelta(minutes=offset)
+
+def next_fires(index, schedules, after, count, conflict_window=None, last_action=None):
+    """Prime `count` esecuzioni dopo il minuto di `after`: lista di `(istante, regola)`.
+
+    Con `conflict_window` restano solo le azioni che lo scheduler eseguira' davvero
+    (stessa risoluzione dei conflitti di `simulate`); `last_action` e' l'istante
+    dell'ultima azione eseguita, che copre ancora l'inizio dell'intervallo.
+    """
+    if conflict_window is not None:
+        # Import locale: simulate dipende da questo modulo
+        from .simulate import simulate
+        if not index.minutes:
+            return []
+        start = next_minute(after)
+        # Ogni settimana ha almeno un'azione eseguita: l'orizzonte raddoppia finche' non bastano
+        horizon, limit = datetime.timedelta(days=1), datetime.timedelta(weeks=count + 1)
+        while True:
+            fires = simulate(schedules, start, start + horizon, index, conflict_window, last_action)
+            if len(fires) >= count or horizon >= limit:
+                return [(when, schedules[idx]) for when, idx in fires[:count]]
+            horizon *= 2
+    events = []
+    when = index.next_fire(after + datetime.timedelta(minutes=1))
+    while when is not None and len(events) < count:
+        for idx in index.rules_at(when):
+            events.append((when, schedules[idx]))
+        when = index.next_fire(when + datetime.timedelta(minutes=1))
+    return events[:count]
+
+class ScheduleSnapshot:
+    """Copia immutabile delle regole, numerata da una generazione crescente."""
+
+    __slots__ = ('generation', 'schedules')
+
+    def __init__(self, generation, schedules):
+        self.generation = generation
+        self.schedules = tuple(schedules)
+
+# Thread per lo scheduling
+class SchedulerThread(threading.Thread):
+    """Dorme fino alla prossima scadenza invece di controllare le regole ogni secondo.
+
+    La UI non condivide la propria lista di regole: a ogni modifica pubblica con
+    `publish()` una `ScheduleSnapshot` immutabile, che il thread legge con un singolo
+    accesso all'attributo (nessun lock). Solo quando la generazione cambia le regole
+    attive vengono compilate in uno `ScheduleIndex` e la prossima scadenza ricalcolata.
+
+    A ogni risveglio il tempo trascorso sull'orologio di sistema viene confrontato con quello monotono:
+    un salto (sospensione, NTP, ora legale) ricalcola le scadenze e le regole perse
+    nel frattempo seguono la loro politica `missed_policy`.
+
+    Al massimo un'azione per finestra di `conflict_window` minuti: una regola lascia
+    il posto a una di priorita' maggiore in arrivo nella finestra, e dopo un'azione
+    le altre regole della finestra vengono saltate.
+    """
+
+    def __init__(self, stop_event, app=None, schedules=(), executor=None,
+                 conflict_window=DEFAULT_CONFLICT_WINDOW):
+        super().__init__(daemon=True)
+        self.stop_event = stop_event
+        # Le azioni girano sul pool dell'executor: il ciclo non attende i comandi
+        self.executor = executor or ActionExecutor()
+        # uid della regola -> minuto dell'ultima esecuzione
+        self.last_executed = {}
+        self.conflict_window = conflict_window
+        # (istante pianificato, uid, istante reale di invio) dell'ultima azione eseguita
+        self._last_action = None
+        # Regole saltate per conflitto: (istante, uid regola, motivo)
+        self.suppressed = collections.deque(maxlen=100)
+        self.app = app  # riferimento alla UI per eseguire callback nel main thread
+        self._generations = itertools.count(1)
+        self.snapshot = ScheduleSnapshot(next(self._generations), schedules)
+        # Snapshot da cui e' stato costruito `index` (quella usata per eseguire le regole)
+        self._active = ScheduleSnapshot(0, ())
+        self.index = ScheduleIndex(())
+        # La stessa coppia in un'unica tupla, letta con un solo accesso da `compiled()`
+        self._armed = (self._active, self.index)
+        # Ultime scadenze mancate: (istante, uid regola, politica, eseguita)
+        self.missed = collections.deque(maxlen=100)
+        self._next_fire = None
+        self._wakeup = threading.Event()
+        # Impostato dopo il primo calcolo delle scadenze (lo scheduler e' operativo)
+        self.armed = threading.Event()
+        self._last_wall = None
+        self._last_mono = None
+        self._last_timeout = 0.0
+        # Esecuzioni avvenute finora: con la generazione invalidano la cache di `upcoming()`
+        self._fires = 0
+        self._upcoming = None  # ((generazione, esecuzioni), eventi, quanti ne erano stati chiesti)
+        self._compiled = None  # (snapshot, indice) pubblicata ma non ancora armata
+
+    def publish(self, schedules, conflict_window=None):
+        """Pubblica una nuova versione delle regole; ritorna la sua generazione.
+
+        Chiamato dal thread UI: lo scheduler si risveglia e ricalcola le scadenze.
+        """
+        if conflict_window is not None:
+            self.conflict_window = conflict_window
+        snapshot = ScheduleSnapshot(next(self._generations), schedules)
+        self.snapshot = snapshot
+        self._wakeup.set()
+        return snapshot.generation
+
+    def upcoming(self, count=UPCOMING_COUNT, now=None):
+        """Prossime `count` esecuzioni delle regole pubblicate, come `(istante, regola)`.
+
+        Chiamabile da qualsiasi thread: il risultato resta in cache finche' non
+        cambiano le regole o non avviene un'esecuzione, quindi le viste possono
+        interrogarlo a ogni aggiornamento senza ricalcolare. Le regole che lo scheduler
+        salterebbe per conflitto (cedono il posto o cadono nella finestra di un'azione) non compaiono.
+        """
+        now = now or datetime.datetime.now()
+        snapshot = self.snapshot
+        key = (snapshot.generation, self._fires)
+        cached = self._upcoming
+        if cached is not None and cached[0] == key and count <= cached[2]:
+            events = cached[1]
+            # Anche senza esecuzioni (scheduler fermo, salto d'orologio) un evento passato invalida
+            if not events or events[0][0] > now:
+                return events[:count]
+        snapshot, index = self.compiled()
+        limit = max(count, UPCOMING_COUNT)
+        last = self._last_action
+        # Finestra dell'ultima azione: vale il piu' recente tra istante pianificato e invio reale
+        last = max(last[0], last[2]) if last is not None else None
+        events = next_fires(index, snapshot.schedules, now, limit, self.conflict_window, last)
+        self._upcoming = ((snapshot.generation, key[1]), events, limit)
+        return events[:count]
+
+    def compiled(self):
+        """`(snapshot, ScheduleIndex)` delle regole pubblicate piu' di recente.
+
+        Per le viste (prossime esecuzioni, heatmap): se il thread non ha ancora armato
+        l'ultima snapshot l'indice viene compilato a parte, senza toccare quello del thread.
+        """
+        snapshot = self.snapshot
+        armed = self._armed
+        if armed[0] is snapshot:
+            return armed
+        compiled = self._compiled
+        if compiled is None or compiled[0] is not snapshot:
+            compiled = (snapshot, ScheduleIndex(snapshot.schedules))
+            self._compiled = compiled
+        return compiled
+
+    def stop(self):
+        self.stop_event.set()
+        self._wakeup.set()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            WAKEUPS.inc()
+            started = time.perf_counter()
+            now = datetime.datetime.now()
+            self._check_clock(now, time.monotonic())
+            # Prima le scadenze gia' armate (una regola del minuto appena iniziato non si
+            # perde se nello stesso istante arriva una nuova snapshot), poi le nuove regole
+            self._fire_due(now)
+            snapshot = self.snapshot
+            if snapshot.generation != self._active.generation:
+                self._arm(snapshot, now)
+            self._last_timeout = self._seconds_until_next(now)
+            NEXT_FIRE.set(self._next_fire.timestamp() if self._next_fire is not None else 0)
+            EVALUATION_SECONDS.observe(time.perf_counter() - started)
+            if self._wakeup.wait(self._last_timeout):
+                self._wakeup.clear()
+
+    def _check_clock(self, now, mono):
+        # Confronta orologio di sistema e tempo monotono dall'ultimo risveglio
+        last_wall, last_mono = self._last_wall, self._last_mono
+        self._last_wall, self._last_mono = now, mono
+        if last_wall is None:
+            return
+        elapsed = mono - last_mono
+        drift = (now - last_wall).total_seconds() - elapsed
+        overslept = elapsed - self._last_timeout
+        if abs(drift) <= CLOCK_JUMP_SECONDS and overslept <= CLOCK_JUMP_SECONDS:
+            return
+        print(f"Salto dell'orologio rilevato (scarto {drift:+.0f}s, ritardo {overslept:.0f}s): ricalcolo le scadenze")
+        if drift < 0:
+            # Orologio tornato indietro: riparti dal minuto successivo, last_executed evita doppie esecuzioni
+            self._next_fire = self.index.next_fire(next_minute(now))
+        # In avanti: _next_fire resta nel passato e _fire_due recupera le regole perse
+
+    def _arm(self, snapshot, now):
+        self.index = ScheduleIndex(snapshot.schedules)
+        self._active = snapshot
+        # Snapshot e indice pubblicati insieme per gli altri thread (un solo assegnamento)
+        self._armed = (snapshot, self.index)
+        # Solo le occorrenze successive all'armo: una regola del minuto in corso (avvio
+        # dell'app, regola appena salvata con l'orario attuale) non scatta subito. I
+        # ritardi veri passano dal rilevamento dei salti d'orologio e da `missed_policy`.
+        self._next_fire = self.index.next_fire(next_minute(now))
+        # Dimentica le esecuzioni delle regole rimosse
+        live = {s.uid for s in snapshot.schedules}
+        self.last_executed = {uid: stamp for uid, stamp in self.last_executed.items() if uid in live}
+        enabled = sum(1 for s in snapshot.schedules if s.enabled)
+        RULES.set(enabled, state='enabled')
+        RULES.set(len(snapshot.schedules) - enabled, state='disabled')
+        self.armed.set()
+
+    def _seconds_until_next(self, now):
+        if self._next_fire is None:
+            return MAX_WAIT_SECONDS
+        delta = (self._next_fire - now).total_seconds()
+        return max(0.0, min(MAX_WAIT_SECONDS, delta))
+
+    def _fire_due(self, now):
+        # Indice e regole vengono dalla stessa snapshot: gli indici sono sempre validi
+        schedules = self._active.schedules
+        if self._next_fire is not None and self._next_fire < now - MISSED_LOOKBACK:
+            self._next_fire = self.index.next_fire(now - MISSED_LOOKBACK)
+        missed = {}
+        due = []
+        while self._next_fire is not None and self._next_fire <= now:
+            when = self._next_fire
+            late = (now - when).total_seconds() >= FIRE_GRACE_SECONDS
+            for idx in self.index.rules_at(when):
+                if late:
+                    # Conta solo l'occorrenza persa piu' recente di ogni regola
+                    missed[idx] = when
+                else:
+                    due.append((idx, when))
+            self._next_fire = self.index.next_fire(when + datetime.timedelta(minutes=1))
+        # Le scadenze perse vengono recuperate tutte nello stesso istante: la priorita'
+        # piu' alta per prima, le altre cadono nella sua finestra di conflitto
+        for idx, when in sorted(missed.items(), key=lambda item: (-schedules[item[0]].priority, item[1])):
+            self._handle_missed(schedules[idx], when, now)
+        for idx, when in due:
+            self._fire(schedules[idx], when, now)
+
+    def _handle_missed(self, s, when, now):
+        policy = s.missed_policy
+        late_minutes = (now - when).total_seconds() / 60
+        run = policy == MISSED_FIRE_ONCE or (policy == MISSED_WITHIN and late_minutes <= s.missed_window)
+        print(f"Regola mancata: {s.action} alle {s.time} ({when}), "
+              f"ritardo {late_minutes:.0f} min, politica {policy}: {'eseguo' if run else 'salto'}")
+        self.missed.append((when, s.uid, policy, run))
+        MISSED.inc(policy=policy, run='true' if run else 'false')
+        if run:
+            self._fire(s, when, now)
+
+    def _fire(self, s, when, now):
+        # Una sola esecuzione per regola e minuto, anche se nello stesso minuto arriva
+        # una nuova snapshot; la chiave e' l'uid, stabile anche se la regola cambia posizione
+        time_str = s.time
+        action = s.action
+        key = s.uid
+        stamp = when.strftime('%Y%m%d%H%M')
+        if self.last_executed.get(key) == stamp:
+            return
+        reason = self._conflict(s, when, now)
+        if reason is not None:
+            print(f"Azione {action} alle {time_str} non eseguita: {reason}")
+            self.suppressed.append((when, key, reason))
+            SUPPRESSED.inc(action=action)
+            self.last_executed[key] = stamp
+            return
+        print(f"Eseguo azione immediata: {action} alle {time_str} ({now})")
+        try:
+            # Accoda l'azione senza avviso ne' attesa del comando
+            FIRE_LATENCY.observe(max(0.0, (datetime.datetime.now() - when).total_seconds()), action=action)
+            self._perform_action(action)
+        except Exception as e:
+            print('Errore esecuzione azione:', e)
+        self.last_executed[key] = stamp
+        self._last_action = (when, key, now)
+        self._fires += 1
+
+    def _conflict(self, s, when, now):
+        """Motivo per non eseguire `s` alle `when` (conflitto nella finestra), None se puo' partire."""
+        window = datetime.timedelta(minutes=self.conflict_window)
+        last = self._last_action
+        if last is not None and (last[0] <= when <= last[0] + window or last[2] <= now <= last[2] + window):
+            # Finestra sia sugli orari pianificati sia sugli invii reali (recuperi dopo la sospensione)
+            return f"azione gia' eseguita alle {last[0]:%H:%M} (finestra di {self.conflict_window} min)"
+        if (now - when).total_seconds() >= FIRE_GRACE_SECONDS:
+            # Esecuzione in ritardo (scadenza mancata): le regole successive sono gia' passate
+            return None
+        # Una regola con priorita' maggiore arriva entro la finestra: cedi il posto a quella
+        schedules = self._active.schedules
+        t = self.index.next_fire(when)
+        while t is not None and t <= when + window:
+            for idx in self.index.rules_at(t):
+                other = schedules[idx]
+                if other.priority > s.priority:
+                    return f"cede alla regola {other.action} delle {other.time} con priorita' {other.priority}"
+            t = self.index.next_fire(t + datetime.timedelta(minutes=1))
+        return None
+    
+    def _show_notification(self, action):
+        # Mostra una notifica non intrusiva sul thread UI
+        # Avviso disabilitato: esecuzione immediata senza popup
+        try:
+            return
+        except Exception:
+            pass
+    
+    def _perform_action(self, action_name):
+        self.executor.submit(action_name)
@@ -0,0 +1,1398 @@
+"""
+Modern UI Shutdown Scheduler per Windows
+- Interfaccia moderna con temi chiari/scuri
+- Esperienza utente migliorata
+- Mantiene tutte le funzionalità originali
+"""
+
+import threading
+import datetime
+# PIL, pystray e ctypes vengono importati al primo utilizzo (icone, tray, area di lavoro)
+# per non rallentare l'avvio, che su molte macchine avviene a ogni login
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import messagebox as tk_messagebox, LEFT, RIGHT, X, BOTH
+
+from .actions import ActionExecutor, create_backend
+from .autostart import set_autostart, is_autostart_enabled
+from .cards import create_card_view
+from .icons import SUPPORTED_SCALES, prerender as prerender_icons, tray_image
+from .bulk import detect_format, export_rules, find_conflicts, import_rules, open_text
+from .config import CONFIG_FILE, ConfigWriter, load_config
+from .model import Schedule, days_to_mask
+from .duplicates import DuplicateIndex
+from .conflicts import ConflictIndex
+from .metrics import RENDER_SECONDS, start_exporters, stop_exporters
+from .heatmap import HeatmapCache, LoadGrid, image_size as heatmap_image_size
+from .sorting import SortIndex, push_sort_column, SORT_DAYS, SORT_TIME, SORT_ACTION, SORT_ENABLED
+from .watcher import ConfigWatcher
+from .engine import (
+    ScheduleIndex, SchedulerThread, MISSED_SKIP, MISSED_FIRE_ONCE, MISSED_WITHIN, DEFAULT_MISSED_WINDOW,
+    DEFAULT_CONFLICT_WINDOW,
+)
+from .theme import (
+    ACCENT_COLOR, HOVER_COLOR, TEXT_COLOR, TEXT_DISABLED, ROOT_BG,
+    BTN_PRIMARY, BTN_PRIMARY_HOV, BTN_DANGER, BTN_DANGER_HOV,
+)
+# Configurazione tema personalizzato
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
+# Tooltip semplice per widget CTk
+class Tooltip:
+    def __init__(self, widget, text: str):
+        self.widget = widget
+        self.text = text
+        self.tip = None
+        widget.bind("<Enter>", self._show)
+        widget.bind("<Leave>", self._hide)
+
+    def _show(self, event=None):
+        try:
+            if self.tip or not self.text:
+                return
+            x = self.widget.winfo_rootx() + 20
+            y = self.widget.winfo_rooty() + self.widget.winfo_height() + 10
+            self.tip = tk.Toplevel(self.widget)
+            self.tip.wm_overrideredirect(True)
+            self.tip.wm_geometry(f"+{x}+{y}")
+            lbl = ctk.CTkLabel(self.tip, text=self.text, fg_color="#111111", corner_radius=6)
+            lbl.pack(ipadx=8, ipady=4)
+        except Exception:
+            pass
+
+    def _hide(self, event=None):
+        try:
+            if self.tip:
+                self.tip.destroy()
+                self.tip = None
+        except Exception:
+            pass
+
+class Messagebox:
+    @staticmethod
+    def show_info(title, message):
+        return tk_messagebox.showinfo(title, message)
+        
+    @staticmethod
+    def show_warning(title, message):
+        return tk_messagebox.showwarning(title, message)
+        
+    @staticmethod
+    def show_error(title, message):
+        return tk_messagebox.showerror(title, message)
+        
+    @staticmethod
+    def show_question(title, message):
+        return tk_messagebox.askyesno(title, message)
+
+# Finestra di dialogo per aggiungere/modificare pianificazioni
+class ScheduleDialog(ctk.CTkToplevel):
+    MISSED_LABELS = {
+        MISSED_SKIP: "Salta",
+        MISSED_FIRE_ONCE: "Esegui al ripristino",
+        MISSED_WITHIN: "Esegui se entro N minuti",
+    }
+
+    def __init__(self, parent, schedule=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.schedule = schedule  # Schedule da modificare, None per una nuova regola
+        self.result = None
+        
+        self.title("Aggiungi pianificazione" if not schedule else "Modifica pianificazione")
+        self.geometry("500x700")
+        # Consenti ridimensionamento verticale per evitare tagli su display ad alto DPI
+        self.resizable(False, True)
+        
+        # Imposta la finestra come modale
+        self.transient(parent)
+        self.grab_set()
+        
+        # Crea il frame principale
+        self.main_frame = ctk.CTkFrame(self, corner_radius=10)
+        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        self._setup_ui()
+        
+        # Se stiamo modificando, popola i campi
+        if schedule:
+            self._load_schedule()
+    
+    def _setup_ui(self):
+        # Etichetta titolo
+        title = "Modifica pianificazione" if self.schedule else "Nuova pianificazione"
+        title_label = ctk.CTkLabel(
+            self.main_frame, 
+            text=title,
+            font=("Segoe UI", 16, "bold")
+        )
+        title_label.pack(pady=(15, 10))
+        
+        # Barra pulsanti: va creata prima cosi' con side=BOTTOM resta realmente ancorata in basso
+        button_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        button_frame.pack(side=tk.BOTTOM, fill=X, padx=20, pady=15)
+        
+        buttons_right = ctk.CTkFrame(button_frame, fg_color="transparent")
+        buttons_right.pack(side=RIGHT)
+        
+        self.save_btn = ctk.CTkButton(
+            buttons_right,
+            text="Salva" if self.schedule else "Aggiungi",
+            command=self._on_save,
+            width=120,
+            height=32,
+            corner_radius=8
+        )
+        self.save_btn.pack(side=RIGHT, padx=5)
+        
+        self.cancel_btn = ctk.CTkButton(
+            buttons_right,
+            text="Annulla",
+            command=self._on_cancel,
+            fg_color="transparent",
+            border_width=1,
+            text_color=("gray10", "#DCE4EE"),
+            width=120,
+            height=32,
+            corner_radius=8
+        )
+        self.cancel_btn.pack(side=RIGHT, padx=5)
+        
+        # Frame per i giorni
+        days_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        days_frame.pack(fill=X, padx=20, pady=(0, 15))
+        
+        ctk.CTkLabel(days_frame, text="Giorni:", anchor="w").pack(fill=X, pady=(0, 5))
+        
+        self.day_vars = {}
+        days = ["Lunedì", "Martedì", "Mercoledì", "Giovedì", "Venerdì", "Sabato", "Domenica"]
+        
+        # Crea i checkbox per i giorni
+        days_container = ctk.CTkFrame(days_frame, fg_color="transparent")
+        days_container.pack(fill=X, pady=5)
+        
+        for i in range(7):
+            col = i % 2
+            row = i // 2
+            
+            if col == 0:
+                row_frame = ctk.CTkFrame(days_container, fg_color="transparent")
+                row_frame.pack(fill=X, pady=2)
+            
+            day_idx = i
+            self.day_vars[day_idx] = ctk.BooleanVar(value=bool(self.schedule and self.schedule.day_mask >> day_idx & 1))
+            cb = ctk.CTkCheckBox(
+                row_frame, 
+                text=days[day_idx],
+                variable=self.day_vars[day_idx],
+                width=100
+            )
+            cb.pack(side=LEFT, padx=5, pady=2, expand=True, fill=X)
+        
+        # Frame per l'orario
+        time_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        time_frame.pack(fill=X, padx=20, pady=10)
+        
+        ctk.CTkLabel(time_frame, text="Orario (HH:MM):", anchor="w").pack(fill=X, pady=(0, 5))
+        
+        self.time_entry = ctk.CTkEntry(time_frame, placeholder_text="HH:MM")
+        self.time_entry.pack(fill=X)
+        
+        # Imposta l'orario corrente se nuovo, altrimenti quello della pianificazione
+        if not self.schedule:
+            self.time_entry.insert(0, datetime.datetime.now().strftime("%H:%M"))
+        else:
+            self.time_entry.delete(0, tk.END)
+            self.time_entry.insert(0, self.schedule.time)
+        
+        # Frame per l'azione
+        action_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        action_frame.pack(fill=X, padx=20, pady=10)
+        
+        ctk.CTkLabel(action_frame, text="Azione:", anchor="w").pack(fill=X, pady=(0, 5))
+        
+        self.action_var = ctk.StringVar(value=self.schedule.action if self.schedule else 'shutdown')
+        
+        shutdown_radio = ctk.CTkRadioButton(
+            action_frame, 
+            text="Spegni il computer", 
+            variable=self.action_var, 
+            value="shutdown"
+        )
+        shutdown_radio.pack(anchor="w", pady=2)
+        
+        hibernate_radio = ctk.CTkRadioButton(
+            action_frame, 
+            text="Iberna il computer", 
+            variable=self.action_var, 
+            value="hibernate"
+        )
+        hibernate_radio.pack(anchor="w", pady=2)
+        
+        # Checkbox per abilitare/disabilitare
+        self.enabled_var = ctk.BooleanVar(value=self.schedule.enabled if self.schedule else True)
+        enabled_cb = ctk.CTkCheckBox(
+            action_frame,
+            text="Attiva questa pianificazione",
+            variable=self.enabled_var
+        )
+        enabled_cb.pack(anchor="w", pady=(10, 0))
+        
+        # Comportamento se il minuto pianificato passa a PC sospeso/ibernato
+        missed_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        missed_frame.pack(fill=X, padx=20, pady=10)
+        
+        ctk.CTkLabel(missed_frame, text="Se l'orario viene perso (PC sospeso):", anchor="w").pack(fill=X, pady=(0, 5))
+        
+        missed_row = ctk.CTkFrame(missed_frame, fg_color="transparent")
+        missed_row.pack(fill=X)
+        
+        policy = self.schedule.missed_policy if self.schedule else MISSED_SKIP
+        self.missed_var = ctk.StringVar(value=self.MISSED_LABELS.get(policy, self.MISSED_LABELS[MISSED_SKIP]))
+        ctk.CTkOptionMenu(
+            missed_row,
+            values=list(self.MISSED_LABELS.values()),
+            variable=self.missed_var,
+            width=200
+        ).pack(side=LEFT)
+        
+        self.missed_window_entry = ctk.CTkEntry(missed_row, width=60, placeholder_text="min")
+        self.missed_window_entry.insert(0, str(self.schedule.missed_window if self.schedule else DEFAULT_MISSED_WINDOW))
+        self.missed_window_entry.pack(side=LEFT, padx=(10, 5))
+        ctk.CTkLabel(missed_row, text="minuti (solo \"entro\")").pack(side=LEFT)
+        
+        # Priorita' in caso di conflitto con altre regole nella stessa finestra
+        priority_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        priority_frame.pack(fill=X, padx=20, pady=10)
+        ctk.CTkLabel(priority_frame, text="Priorità (in caso di conflitto vince la più alta):", anchor="w").pack(side=LEFT)
+        self.priority_entry = ctk.CTkEntry(priority_frame, width=60)
+        self.priority_entry.insert(0, str(self.schedule.priority if self.schedule else 0))
+        self.priority_entry.pack(side=LEFT, padx=(10, 0))
+        
+        # (i pulsanti sono gia' stati creati e ancorati in basso)
+        
+        # Il riferimento a time_entry è già salvato come self.time_entry
+    
+    def _load_schedule(self):
+        # Questo metodo popola i campi con i valori esistenti
+        for day in self.schedule.days:
+            self.day_vars[day].set(True)
+        
+        self.time_entry.delete(0, tk.END)
+        self.time_entry.insert(0, self.schedule.time)
+        self.action_var.set(self.schedule.action)
+        self.enabled_var.set(self.schedule.enabled)
+    
+    def _on_save(self):
+        # Validazione
+        time_str = self.time_entry.get().strip()
+        
+        try:
+            # Verifica il formato dell'orario
+            hours, minutes = map(int, time_str.split(':'))
+            if not (0 <= hours <= 23 and 0 <= minutes <= 59):
+                raise ValueError("Ora non valida")
+            minute = hours * 60 + minutes
+        except (ValueError, AttributeError):
+            Messagebox.show_error("Formato orario non valido. Usa il formato HH:MM", "Errore")
+            return
+        
+        # Ottieni i giorni selezionati
+        selected_days = [day for day, var in self.day_vars.items() if var.get()]
+        
+        if not selected_days:
+            Messagebox.show_warning("Seleziona almeno un giorno della settimana", "Attenzione")
+            return
+            
+        # Ottieni l'azione selezionata e lo stato
+        action = self.action_var.get()
+        enabled = self.enabled_var.get()
+        
+        missed_policy = next(
+            (key for key, label in self.MISSED_LABELS.items() if label == self.missed_var.get()),
+            MISSED_SKIP
+        )
+        try:
+            missed_window = int(self.missed_window_entry.get().strip())
+            if missed_window < 0:
+                raise ValueError("Finestra negativa")
+        except ValueError:
+            Messagebox.show_error("Numero di minuti non valido", "Errore")
+            return
+        try:
+            priority = int(self.priority_entry.get().strip())
+        except ValueError:
+            Messagebox.show_error("Priorità non valida: usa un numero intero", "Errore")
+            return
+            
+        fields = dict(
+            day_mask=days_to_mask(selected_days),
+            minute=minute,
+            action=action,
+            enabled=enabled,
+            missed_policy=missed_policy,
+            missed_window=missed_window,
+            priority=priority
+        )
+        # In modifica conserva identita' (uid) e campi extra della regola
+        self.result = self.schedule.replace(**fields) if self.schedule else Schedule(**fields)
+        
+        self.destroy()
+        
+    def _on_cancel(self):
+        # Chiudi la finestra senza salvare
+        self.result = None
+        self.destroy()
+
+# Classe principale dell'applicazione
+class ModernShutdownScheduler(ctk.CTk):
+    # Voci del menu di ordinamento -> colonna (None = ordine della configurazione)
+    SORT_LABELS = {
+        "Ordine: config": None,
+        "Ordine: giorni": SORT_DAYS,
+        "Ordine: orario": SORT_TIME,
+        "Ordine: azione": SORT_ACTION,
+        "Ordine: stato": SORT_ENABLED,
+    }
+    # Righe del pannello "Upcoming" e intervallo di aggiornamento dei tempi relativi
+    UPCOMING_ROWS = 3
+    UPCOMING_REFRESH_MS = 30000
+
+    def __init__(self, action_backend=None):
+        super().__init__()
+        # Backend delle azioni forzato da riga di comando (es. --dry-run), altrimenti da config
+        self.action_backend = action_backend
+        
+        # Configurazione della finestra
+        self.title("Shutdown Scheduler")
+        # Finestra a dimensione fissa (niente ridimensionamento), ma con toggle fullscreen
+        self.fixed_width, self.fixed_height = 900, 750
+        self.geometry(f"{self.fixed_width}x{self.fixed_height}")
+        # Blocca lo scaling manuale
+        self.minsize(self.fixed_width, self.fixed_height)
+        self.maxsize(self.fixed_width, self.fixed_height)
+        self.resizable(False, False)
+        # Centra la finestra sullo schermo (dopo che la finestra è stata creata)
+        try:
+            self.after(0, self._center_window)
+        except Exception:
+            self._center_window()
+        # Gestione fullscreen: F11 per entrare/uscire, Esc per uscire
+        self.is_fullscreen = False
+        try:
+            self.bind('<F11>', lambda e: self._toggle_fullscreen())
+            self.bind('<Escape>', lambda e: self._exit_fullscreen())
+        except Exception:
+            pass
+        # Sfondo uniforme dell'app
+        try:
+            self.configure(fg_color=ROOT_BG)
+        except Exception:
+            pass
+        
+        # Carica la configurazione; i salvataggi avvengono in background (write-behind)
+        self.cfg = load_config()
+        self.config_writer = ConfigWriter(CONFIG_FILE)
+        # Ordinamenti della lista mantenuti a ogni modifica; spec vuoto = ordine della config
+        self.sort_index = SortIndex(self.cfg['schedules'])
+        self.sort_spec = ()
+        # Chiavi canoniche delle regole per il controllo duplicati in O(1)
+        self.dup_index = DuplicateIndex(self.cfg['schedules'])
+        # Occorrenze settimanali delle regole attive, per segnalare i conflitti al salvataggio
+        self.conflict_index = ConflictIndex(self.cfg['schedules'])
+        # Heatmap giorno x ora, ridisegnata solo quando cambiano le regole pubblicate
+        self.heatmap = HeatmapCache()
+        # Default per nuova impostazione: avvio minimizzato su tray
+        if 'start_minimized_tray' not in self.cfg:
+            self.cfg['start_minimized_tray'] = False
+        
+        # Imposta forzatamente il tema scuro (disabilita modalita' chiara)
+        self.theme_mode = 'dark'
+        ctk.set_appearance_mode("Dark")
+        # Sincronizza la config per coerenza
+        self.cfg['theme'] = 'dark'
+        # Applica scala UI (ridurre la scala migliora le performance su macchine lente)
+        ui_scale = float(self.cfg.get('ui_scale', 1.0))
+        try:
+            ctk.set_widget_scaling(ui_scale)
+            ctk.set_window_scaling(ui_scale)
+        except Exception:
+            pass
+        # Icone di toolbar e tray disegnate in background, prima la scala in uso
+        prerender_icons((ui_scale,) + tuple(sc for sc in SUPPORTED_SCALES if sc != ui_scale))
+        self._save_config()
+        
+        # Inizializza le variabili
+        self.scheduler = None
+        self.stop_event = threading.Event()
+        self.tray_icon = None
+        # Inizializza selezione per evitare errori in hover
+        self.selected_row = None
+        self._render_pending = False
+        self._resizing = False
+        self._resize_after = None
+        
+        # Crea l'interfaccia utente
+        self._setup_ui()
+        # Inizializza la tray icon (se disponibile)
+        try:
+            self._create_tray_icon()
+        except Exception:
+            pass
+        # Avvio minimizzato su tray (se impostato)
+        try:
+            if bool(self.cfg.get('start_minimized_tray', False)):
+                self.withdraw()
+        except Exception:
+            pass
+        # Throttle durante il resize finestra
+        try:
+            self.bind('<Configure>', self._on_window_configure)
+        except Exception:
+            pass
+        # Scorciatoie da tastiera
+        self._bind_shortcuts()
+        
+        # Avvia il thread di pianificazione
+        self._start_scheduler()
+        # Heatmap e stats dalle regole dello scheduler (i pannelli ora esistono)
+        self._update_side_panels_stats(self.cfg.get('schedules', []))
+        # Ricarica a caldo le modifiche esterne a config.json
+        self._start_config_watcher()
+        # Prossime esecuzioni (pannello e tooltip del tray), dalla cache dello scheduler
+        self._schedule_upcoming_refresh()
+        # Metriche (file .prom e/o /metrics su localhost), se abilitate in config
+        self.metrics_exporters = start_exporters(self.cfg)
+        
+        # Gestisci la chiusura della finestra
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _setup_ui(self):
+        # Configura il layout principale (due colonne: cards a sinistra, pannelli a destra)
+        # Aumenta lo spazio per le cards (più largo a sinistra)
+        self.grid_columnconfigure(0, weight=8)
+        self.grid_columnconfigure(1, weight=0)
+        # Imposta una larghezza minima più piccola al pannello destro per dare più spazio alle card
+        try:
+            self.grid_columnconfigure(1, minsize=240)
+        except Exception:
+            pass
+        
+        # Barra superiore
+        self.header = ctk.CTkFrame(self, corner_radius=0, fg_color=ROOT_BG)
+        self.header.grid(row=0, column=0, sticky="nsew", columnspan=2)
+        self.header.grid_columnconfigure(1, weight=1)
+        
+        # Titolo
+        title = ctk.CTkLabel(
+            self.header, 
+            text="Shutdown Scheduler",
+            font=("Segoe UI", 20, "bold"),
+            text_color=TEXT_COLOR
+        )
+        title.grid(row=0, column=0, padx=20, pady=15, sticky="w")
+        # Contatori a destra nell'header
+        counters = ctk.CTkFrame(self.header, fg_color="transparent")
+        counters.grid(row=0, column=1, padx=20, pady=10, sticky="e")
+        self.rules_count_var = ctk.StringVar(value="0")
+        self.active_count_var = ctk.StringVar(value="0")
+        ctk.CTkLabel(counters, textvariable=self.rules_count_var, font=("Segoe UI", 16, "bold"), anchor="e").pack(side="left", padx=8)
+        ctk.CTkLabel(counters, text="Rules", anchor="w").pack(side="left")
+        ctk.CTkLabel(counters, textvariable=self.active_count_var, font=("Segoe UI", 16, "bold"), anchor="e").pack(side="left", padx=(20,8))
+        ctk.CTkLabel(counters, text="Active", anchor="w").pack(side="left")
+        self.ready_pill = ctk.CTkLabel(counters, text="Ready", fg_color="#1a1a1a", corner_radius=12, padx=10, pady=2)
+        self.ready_pill.pack(side="left", padx=12)
+        
+        # (Modalita' chiara disabilitata: rimosso pulsante cambio tema)
+        
+        # Inizializza variabili UI necessarie ai pannelli
+        self.autostart_var = ctk.BooleanVar(value=is_autostart_enabled())
+        # Stato (variabile nascosta, niente footer visibile)
+        self.status_var = ctk.StringVar(value="")
+        # Elenco pianificazioni in stile "cards" e pannelli laterali
+        self._setup_schedule_cards()
+        self._setup_side_panels()
+        
+        # (Footer rimosso su richiesta; nessun controllo visibile in basso)
+    
+    def _setup_schedule_cards(self):
+        # Colonna sinistra: barra azioni + lista cards
+        left_col = ctk.CTkFrame(self, corner_radius=8, fg_color=ROOT_BG)
+        # Spingi a destra: riduci il padding destro per guadagnare spazio sulle card
+        left_col.grid(row=1, column=0, padx=(10,0), pady=(0, 16), sticky="nsew")
+        left_col.grid_columnconfigure(0, weight=1)
+        left_col.grid_rowconfigure(1, weight=1)
+
+        # Barra azioni compatta
+        actions = ctk.CTkFrame(left_col, corner_radius=6)
+        actions.grid(row=0, column=0, sticky="ew", padx=0, pady=(0,8))
+        # Colonne compatte senza stretch
+        for c in range(5):
+            try:
+                actions.grid_columnconfigure(c, weight=0)
+            except Exception:
+                pass
+        btn_w = 100
+        btn_h = 34
+        gap   = 6
+        add_btn = ctk.CTkButton(
+            actions, text="Aggiungi", width=btn_w, height=btn_h,
+            fg_color=BTN_PRIMARY, hover_color=BTN_PRIMARY_HOV, text_color=TEXT_COLOR,
+            corner_radius=8, command=self._add_schedule
+        )
+        add_btn.grid(row=0, column=0, padx=(8,gap), pady=6)
+        edit_btn = ctk.CTkButton(
+            actions, text="Modifica", width=btn_w, height=btn_h,
+            fg_color=BTN_PRIMARY, hover_color=BTN_PRIMARY_HOV, text_color=TEXT_COLOR,
+            corner_radius=8, command=self._edit_schedule
+        )
+        edit_btn.grid(row=0, column=1, padx=(gap,gap), pady=6)
+        save_btn = ctk.CTkButton(
+            actions, text="Save Config", width=btn_w, height=btn_h,
+            fg_color=BTN_PRIMARY, hover_color=BTN_PRIMARY_HOV, text_color=TEXT_COLOR,
+            corner_radius=8, command=lambda: (self._save_config(flush=True), self.status_var.set("Configurazione salvata"))
+        )
+        save_btn.grid(row=0, column=2, padx=(gap,gap), pady=6)
+        del_btn = ctk.CTkButton(
+            actions, text="Elimina", width=btn_w, height=btn_h,
+            fg_color=BTN_DANGER, hover_color=BTN_DANGER_HOV, text_color=TEXT_COLOR,
+            corner_radius=8, command=self._remove_schedule
+        )
+        del_btn.grid(row=0, column=3, padx=(gap,8), pady=6)
+        # Ordinamento: riscegliere la stessa colonna inverte il verso
+        self.sort_var = ctk.StringVar(value=next(iter(self.SORT_LABELS)))
+        ctk.CTkOptionMenu(
+            actions, values=list(self.SORT_LABELS), variable=self.sort_var, width=btn_w + 20, height=btn_h,
+            corner_radius=8, command=lambda label: self._sort_by(self.SORT_LABELS[label])
+        ).grid(row=0, column=4, padx=(gap,8), pady=6)
+
+        # Contenitore scrollabile per le "cards"
+        cards_frame = ctk.CTkFrame(left_col, corner_radius=8, fg_color=ROOT_BG)
+        cards_frame.grid(row=1, column=0, sticky="nsew")
+        cards_frame.grid_columnconfigure(0, weight=1)
+        cards_frame.grid_rowconfigure(0, weight=1)
+
+        # Usa tk.Canvas per performance nel ridimensionamento
+        self.cards_canvas = tk.Canvas(cards_frame, bg=ROOT_BG, highlightthickness=0, highlightbackground=ROOT_BG, highlightcolor=ROOT_BG)
+        # Scrollbar sottile e scura (quasi invisibile) per evitare gutter bianchi
+        self.cards_vsb = ctk.CTkScrollbar(
+            cards_frame,
+            orientation="vertical",
+            width=6,
+            fg_color=ROOT_BG,
+            button_color="#2a2a2a",
+            button_hover_color="#3a3a3a",
+            corner_radius=8,
+        )
+        self.cards_vsb.pack(side=RIGHT, fill="y", padx=0)
+        # Assicurati che il canvas occupi TUTTA la larghezza del contenitore
+        self.cards_canvas.pack(fill="both", expand=True)
+        # Lista virtualizzata: gestisce scrollregion, scrollbar e card visibili
+        # (motore "widgets" o "canvas" secondo config, per confrontarli)
+        self.card_view = create_card_view(self.cfg.get('render_engine', 'widgets'), self, self.cards_canvas, self.cards_vsb)
+        # Scorrimento con rotellina del mouse anche senza scrollbar visibile
+        def _on_mousewheel(event):
+            try:
+                delta = int(-1 * (event.delta / 120))
+            except Exception:
+                delta = -1
+            self.cards_canvas.yview_scroll(delta, "units")
+            return "break"
+        try:
+            self.cards_canvas.bind_all("<MouseWheel>", _on_mousewheel)
+        except Exception:
+            pass
+
+        self._render_cards()
+
+    def _setup_side_panels(self):
+        # Colonna destra con pannelli
+        side = ctk.CTkFrame(self, corner_radius=8, fg_color=ROOT_BG)
+        # Avvicina il pannello a destra e riduci il padding sinistro, così le card hanno più spazio
+        side.grid(row=1, column=1, padx=(6,12), pady=(0,16), sticky="nsew")
+        side.grid_columnconfigure(0, weight=1)
+
+        # Settings panel
+        settings = ctk.CTkFrame(side, corner_radius=8)
+        # Rimuovi padding superiore per allineare l'altezza con la barra azioni a sinistra
+        settings.pack(fill="x", pady=(0,8))
+        ctk.CTkLabel(settings, text="Settings", font=("Segoe UI", 12, "bold"), anchor="w").pack(fill="x", padx=12, pady=(10,6))
+        autostart_row = ctk.CTkFrame(settings, fg_color="transparent")
+        autostart_row.pack(fill="x", padx=12, pady=(0,6))
+        ctk.CTkLabel(autostart_row, text="Start with Windows", anchor="w").pack(side="left")
+        autostart_toggle = ctk.CTkSwitch(autostart_row, text="", variable=self.autostart_var, command=self._toggle_autostart)
+        autostart_toggle.pack(side="right")
+
+        # Start minimized to tray
+        tray_row = ctk.CTkFrame(settings, fg_color="transparent")
+        tray_row.pack(fill="x", padx=12, pady=(0,10))
+        ctk.CTkLabel(tray_row, text="Start minimized to tray", anchor="w").pack(side="left")
+        self.start_min_tray_var = ctk.BooleanVar(value=bool(self.cfg.get('start_minimized_tray', False)))
+        tray_toggle = ctk.CTkSwitch(tray_row, text="", variable=self.start_min_tray_var, command=self._toggle_start_minimized_tray)
+        tray_toggle.pack(side="right")
+        
+        # Upcoming: prossime esecuzioni
+        upcoming = ctk.CTkFrame(side, corner_radius=8)
+        upcoming.pack(fill="x", pady=8)
+        ctk.CTkLabel(upcoming, text="Upcoming", font=("Segoe UI", 12, "bold"), anchor="w").pack(fill="x", padx=12, pady=(10,4))
+        self.upcoming_vars = []
+        for i in range(self.UPCOMING_ROWS):
+            var = ctk.StringVar(value="Nessuna esecuzione pianificata" if i == 0 else "")
+            ctk.CTkLabel(upcoming, textvariable=var, anchor="w").pack(fill="x", padx=12, pady=(0, 8 if i == self.UPCOMING_ROWS - 1 else 0))
+            self.upcoming_vars.append(var)
+
+        # Analytics (include Weekly Activity e Stats)
+        analytics = ctk.CTkFrame(side, corner_radius=8)
+        analytics.pack(fill="x", pady=8)
+        ctk.CTkLabel(analytics, text="Analytics", font=("Segoe UI", 12, "bold"), anchor="w").pack(fill="x", padx=12, pady=(10,6))
+        # Weekly Activity: heatmap giorno x ora in un'unica immagine
+        weekly = ctk.CTkFrame(analytics, corner_radius=8)
+        weekly.pack(fill="x")
+        ctk.CTkLabel(weekly, text="Weekly Activity", font=("Segoe UI", 11, "bold"), anchor="w").pack(fill="x", padx=12, pady=(6,4))
+        self.heatmap_label = ctk.CTkLabel(weekly, text="", anchor="w")
+        self.heatmap_label.pack(fill="x", padx=12, pady=(0,6))
+        # Stats sintetiche
+        stats = ctk.CTkFrame(analytics, corner_radius=8)
+        stats.pack(fill="x", pady=(6, 10))
+        row = ctk.CTkFrame(stats, fg_color="transparent")
+        row.pack(fill="x", padx=12, pady=6)
+        ctk.CTkLabel(row, text="Totali:", width=60).pack(side="left")
+        self.stat_total = ctk.StringVar(value=self.stat_total.get() if hasattr(self, 'stat_total') else "0")
+        ctk.CTkLabel(row, textvariable=self.stat_total, font=("Segoe UI", 14, "bold")).pack(side="left", padx=(4,12))
+        ctk.CTkLabel(row, text="Attive:").pack(side="left")
+        self.stat_active = ctk.StringVar(value=self.stat_active.get() if hasattr(self, 'stat_active') else "0")
+        ctk.CTkLabel(row, textvariable=self.stat_active, font=("Segoe UI", 14, "bold")).pack(side="left", padx=(4,12))
+        ctk.CTkLabel(row, text="Peak Day:").pack(side="left")
+        self.stat_peak = ctk.StringVar(value=self.stat_peak.get() if hasattr(self, 'stat_peak') else "-")
+        ctk.CTkLabel(row, textvariable=self.stat_peak, font=("Segoe UI", 14, "bold")).pack(side="left", padx=(4,0))
+
+        # Info panel
+        info = ctk.CTkFrame(side, corner_radius=8)
+        info.pack(fill="x", pady=8)
+        ctk.CTkLabel(info, text="Config Path", anchor="w").pack(fill="x", padx=12, pady=(10,2))
+        ctk.CTkLabel(info, text=str(CONFIG_FILE), anchor="w", text_color=TEXT_DISABLED).pack(fill="x", padx=12, pady=(0,6))
+        # Import/export in blocco (JSON Lines o CSV)
+        transfer_row = ctk.CTkFrame(info, fg_color="transparent")
+        transfer_row.pack(fill="x", padx=12, pady=(0,10))
+        ctk.CTkButton(transfer_row, text="Import...", width=90, height=28, corner_radius=8,
+                      command=self._import_rules).pack(side="left")
+        ctk.CTkButton(transfer_row, text="Export...", width=90, height=28, corner_radius=8,
+                      command=self._export_rules).pack(side="left", padx=(8,0))
+
+        # Bottom stats
+        stats = ctk.CTkFrame(side, corner_radius=8)
+        stats.pack(fill="x", pady=8)
+        stats_row = ctk.CTkFrame(stats, fg_color="transparent")
+        stats_row.pack(fill="x", padx=12, pady=10)
+        self.stat_total = ctk.StringVar(value="0")
+        self.stat_active = ctk.StringVar(value="0")
+        self.stat_peak = ctk.StringVar(value="-")
+        lbl_total = ctk.CTkLabel(stats_row, textvariable=self.stat_total, font=("Segoe UI", 16, "bold"))
+        lbl_total.pack(side="left")
+        lbl_total_text = ctk.CTkLabel(stats_row, text=" Total Rules", padx=12)
+        lbl_total_text.pack(side="left")
+        lbl_active = ctk.CTkLabel(stats_row, textvariable=self.stat_active, font=("Segoe UI", 16, "bold"))
+        lbl_active.pack(side="left", padx=(20,0))
+        lbl_active_text = ctk.CTkLabel(stats_row, text=" Active")
+        lbl_active_text.pack(side="left")
+        lbl_peak = ctk.CTkLabel(stats_row, textvariable=self.stat_peak, font=("Segoe UI", 16, "bold"))
+        lbl_peak.pack(side="left", padx=(20,0))
+        lbl_peak_text = ctk.CTkLabel(stats_row, text=" Peak Day")
+        lbl_peak_text.pack(side="left")
+
+        self.side_panel = side
+
+    def _create_day_badge(self, parent, text, active=True):
+        fg = "#1e1e1e" if active else "#2a2a2a"
+        txt = TEXT_COLOR if active else TEXT_DISABLED
+        badge = ctk.CTkLabel(parent, text=text, fg_color=fg, text_color=txt, corner_radius=12, padx=8, pady=2)
+        return badge
+
+    def _create_pill(self, parent, text):
+        return ctk.CTkLabel(parent, text=text, fg_color="#", text_color=TEXT_COLOR, corner_radius=12, padx=10, pady=2)
+
+    def _toggle_schedule_enabled(self, idx, value):
+        try:
+            self._replace_rule(idx, self.cfg['schedules'][idx].replace(enabled=bool(value)))
+            self._save_config()
+            self._publish_schedules()
+            self.status_var.set("Stato regola aggiornato")
+        except Exception:
+            pass
+
+    def _toggle_enabled_by_index(self, idx):
+        """Toggle enabled state for schedule at index and refresh UI."""
+        try:
+            schedules = self.cfg.get('schedules', [])
+            if 0 <= idx < len(schedules):
+                updated = schedules[idx].replace(enabled=not schedules[idx].enabled)
+                # Riattivare una regola puo' metterla in conflitto con quelle attive
+                if updated.enabled and not self._check_conflicts(updated):
+                    return
+                self._replace_rule(idx, updated)
+                # Salva e aggiorna pill e contatori
+                self._after_config_change("Stato regola aggiornato")
+        except Exception:
+            pass
+
+    def _toggle_start_minimized_tray(self):
+        try:
+            val = bool(self.start_min_tray_var.get())
+            self.cfg['start_minimized_tray'] = val
+            self._save_config()
+            self.status_var.set("Impostazione avvio minimizzato aggiornata")
+        except Exception:
+            pass
+
+    def _render_cards(self):
+        view = getattr(self, 'card_view', None)
+        if not view:
+            return
+        schedules = self.cfg.get('schedules', [])
+        # Aggiorna header, status e pannelli in modo centralizzato
+        self._update_overview(schedules)
+        # Ordine di visualizzazione dall'indice di ordinamento (nessun sort qui)
+        order = None
+        if self.sort_spec:
+            index_of = {s.uid: i for i, s in enumerate(schedules)}
+            order = [index_of[uid] for uid in self.sort_index.order(self.sort_spec)]
+        # Solo le card visibili vengono (ri)assegnate ai dati
+        view.set_schedules(schedules, order)
+        prev_sel = getattr(self, 'selected_row', None)
+        view.set_selected(prev_sel if prev_sel is not None and 0 <= prev_sel < len(schedules) else None)
+
+    def _select_card(self, idx, event=None):
+        """Seleziona la card all'indice dato aggiornando l'evidenziazione e lo stato interno."""
+        try:
+            if not (isinstance(idx, int) and 0 <= idx < len(self.cfg.get('schedules', []))):
+                return
+            self.selected_row = idx
+            self.card_view.set_selected(idx)
+        except Exception:
+            pass
+
+    def _on_card_double_click(self, idx, event=None):
+        try:
+            self._select_card(idx)
+            self._edit_schedule()
+        except Exception:
+            pass
+
+    def _request_render(self):
+        # Debounce del rendering per migliorare le performance durante cambi rapidi
+        if self._render_pending:
+            return
+        self._render_pending = True
+        try:
+            # Se si sta ridimensionando, posticipa leggermente per evitare scatti
+            if self._resizing:
+                self.after(150, self._do_render)
+            else:
+                self.after_idle(self._do_render)
+        except Exception:
+            # fallback immediato
+            self._do_render()
+
+    def _do_render(self):
+        self._render_pending = False
+        with RENDER_SECONDS.time():
+            self._render_cards()
+
+    # -------------------- Helper di utilità per evitare duplicazioni --------------------
+    def _set_var(self, name, value):
+        # Aggiorna la StringVar solo se il valore cambia (evita ridisegni inutili delle label)
+        var = getattr(self, name, None)
+        if var is not None and var.get() != value:
+            var.set(value)
+
+    def _update_overview(self, schedules):
+        try:
+            # Totali e attive
+            total = len(schedules)
+            active = sum(1 for s in schedules if s.enabled)
+            self._set_var('status_var', f"Regole: {total} | Attive: {active}")
+            self._set_var('rules_count_var', str(total))
+            self._set_var('active_count_var', str(active))
+            # Aggiorna pannelli laterali
+            self._update_side_panels_stats(schedules, total, active)
+        except Exception as e:
+            print('Update overview error:', e)
+
+        
+    def _update_heatmap(self, schedules):
+        """Ricalcola la heatmap solo se le regole pubblicate sono cambiate; ritorna la griglia."""
+        scheduler = getattr(self, 'scheduler', None)
+        if scheduler is not None:
+            snapshot, index = scheduler.compiled()
+            key = snapshot.generation
+        else:
+            # Prima dell'avvio dello scheduler: nessuna generazione, indice temporaneo
+            index, key = ScheduleIndex(schedules), None
+        if not hasattr(self, 'heatmap_label'):
+            # Pannello non ancora creato: solo la griglia per le stats, la cache non va
+            # segnata come aggiornata finche' l'immagine non e' stata applicata alla label
+            return LoadGrid(index, self.heatmap.bucket_minutes)
+        scale = float(self.cfg.get('ui_scale', 1.0))
+        if self.heatmap.update(key, index, scale):
+            image = self.heatmap.image
+            if image is not None:
+                size = heatmap_image_size(self.heatmap.grid)
+                self._heatmap_image = ctk.CTkImage(light_image=image, dark_image=image, size=size)
+                self.heatmap_label.configure(image=self._heatmap_image)
+        return self.heatmap.grid
+
+    def _update_side_panels_stats(self, schedules, total=None, active=None):
+        """Aggiorna la heatmap settimanale e le stats sintetiche (solo i valori cambiati)"""
+        try:
+            # Esecuzioni per giorno dalla stessa griglia della heatmap (solo regole attive)
+            counts = self._update_heatmap(schedules).day_totals()
+            max_c = max(counts)
+            # Stats: total, active, peak day
+            if total is None:
+                total = len(schedules)
+            if active is None:
+                active = sum(1 for s in schedules if s.enabled)
+            self._set_var('stat_total', str(total))
+            self._set_var('stat_active', str(active))
+            peak_idx = counts.index(max(counts)) if counts else 0
+            self._set_var('stat_peak', self._get_day_name(peak_idx) if max_c > 0 else '-')
+        except Exception as e:
+            print('Update side panels error:', e)
+    
+    def _format_upcoming(self, when, s, now):
+        minutes = max(0, int((when - now).total_seconds() // 60))
+        if minutes < 60:
+            delay = f"tra {minutes} min"
+        elif minutes < 24 * 60:
+            delay = f"tra {minutes // 60} h {minutes % 60:02d} min"
+        else:
+            delay = f"tra {minutes // (24 * 60)} g"
+        return f"{self._get_day_name(when.weekday())} {when:%H:%M}  {s.action.capitalize()}  ({delay})"
+
+    def _refresh_upcoming(self):
+        """Aggiorna pannello Upcoming e tooltip del tray (la lista arriva dalla cache dello scheduler)."""
+        try:
+            scheduler = getattr(self, 'scheduler', None)
+            events = scheduler.upcoming(self.UPCOMING_ROWS) if scheduler else []
+            now = datetime.datetime.now()
+            texts = [self._format_upcoming(when, s, now) for when, s in events]
+            if not texts:
+                texts = ["Nessuna esecuzione pianificata"]
+            texts += [""] * (len(getattr(self, 'upcoming_vars', ())) - len(texts))
+            for var, text in zip(getattr(self, 'upcoming_vars', ()), texts):
+                if var.get() != text:
+                    var.set(text)
+            title = "Shutdown Scheduler"
+            if events:
+                when, s = events[0]
+                title += f" - {s.action.capitalize()} {self._get_day_name(when.weekday())} {when:%H:%M}"
+            if self.tray_icon is not None and self.tray_icon.title != title:
+                self.tray_icon.title = title
+        except Exception as e:
+            print('Update upcoming error:', e)
+
+    def _schedule_upcoming_refresh(self):
+        # I tempi relativi cambiano col passare dei minuti; la lista stessa e' in cache
+        self._refresh_upcoming()
+        try:
+            self.after(self.UPCOMING_REFRESH_MS, self._schedule_upcoming_refresh)
+        except Exception:
+            pass
+
+    def _on_row_click(self, event, idx):
+        # Gestisce il click su una riga in modo robusto (nessun errore se non c'era selezione)
+        try:
+            self._select_row(idx)
+        except Exception as e:
+            # Non interrompere l'app se la selezione fallisce
+            print("Errore selezione riga:", e)
+
+    def _select_row(self, idx):
+        # Ripristina la selezione precedente, se esiste ed è valida
+        if (
+            hasattr(self, 'selected_row')
+            and isinstance(self.selected_row, int)
+            and 0 <= self.selected_row < len(self.table_rows)
+            and hasattr(self, 'selected_row_frame')
+            and self.selected_row_frame is not None
+        ):
+            # Usa il colore originale salvato per evitare calcoli con indici e None
+            prev_bg = self.table_rows[self.selected_row].get('bg', "#2b2b2b")
+            try:
+                self.selected_row_frame.configure(fg_color=prev_bg)
+                # ripristina banda selezione
+                if 'accent' in self.table_rows[self.selected_row]:
+                    self.table_rows[self.selected_row]['accent'].configure(fg_color=prev_bg)
+            except Exception:
+                pass
+        # Imposta nuova selezione
+        self.selected_row = idx
+        self.selected_row_frame = self.table_rows[idx]['frame']
+        try:
+            self.selected_row_frame.configure(fg_color=HOVER_COLOR)
+            # evidenzia banda a sinistra
+            if 'accent' in self.table_rows[idx]:
+                self.table_rows[idx]['accent'].configure(fg_color=ACCENT_COLOR)
+        except Exception:
+            pass
+    
+    def _sort_by(self, column):
+        # Nuova colonna primaria (le precedenti restano come chiavi secondarie) o
+        # inversione del verso; None torna all'ordine della configurazione.
+        # Gli ordinamenti sono gia' mantenuti dall'indice: la vista sposta solo le card
+        self.sort_spec = push_sort_column(self.sort_spec, column) if column else ()
+        self._request_render()
+        if self.sort_spec:
+            column, reverse = self.sort_spec[0]
+            label = next(text for text, col in self.SORT_LABELS.items() if col == column)
+            self.status_var.set(f"{label}{' (decrescente)' if reverse else ''}")
+
+    # -------------------- Modifiche alle regole (aggiornano anche gli indici) --------------------
+    def _append_rule(self, s):
+        self.cfg['schedules'].append(s)
+        self.sort_index.add(s)
+        self.dup_index.add(s)
+        self.conflict_index.add(s)
+
+    def _replace_rule(self, idx, s):
+        schedules = self.cfg['schedules']
+        old, schedules[idx] = schedules[idx], s
+        self.sort_index.replace(old, s)
+        self.dup_index.replace(old, s)
+        self.conflict_index.replace(old, s)
+
+    def _extend_rules(self, rules):
+        self.cfg['schedules'].extend(rules)
+        self.sort_index.extend(rules)
+        for s in rules:
+            self.dup_index.add(s)
+            self.conflict_index.add(s)
+
+    def _delete_rule(self, idx):
+        old = self.cfg['schedules'].pop(idx)
+        self.sort_index.remove(old)
+        self.dup_index.remove(old)
+        self.conflict_index.remove(old)
+
+    def _reset_rules(self):
+        # Lista sostituita per intero (es. config ricaricata): ricostruisci gli indici
+        schedules = self.cfg['schedules']
+        self.sort_index.reset(schedules)
+        self.dup_index.reset(schedules)
+        self.conflict_index.reset(schedules)
+
+    def _check_duplicates(self, s, ignore_uid=None):
+        """False se `s` duplica una regola esistente o se l'utente rinuncia dopo
+        l'avviso di sovrapposizione con regole alla stessa ora e con la stessa azione."""
+        if self.dup_index.find_duplicate(s, ignore_uid) is not None:
+            Messagebox.show_warning("Esiste già una pianificazione identica", "Duplicato")
+            return False
+        overlap = self.dup_index.overlap_mask(s, ignore_uid)
+        if overlap:
+            days = ", ".join(self._get_day_name(d) for d in range(7) if overlap >> d & 1)
+            return Messagebox.show_question(
+                "Possibile duplicato",
+                f"Esiste già una pianificazione alle {s.time} con la stessa azione per: {days}.\n"
+                "Salvare comunque?"
+            )
+        return True
+
+    def _conflict_window(self):
+        return self.cfg.get('conflict_window', DEFAULT_CONFLICT_WINDOW)
+
+    def _check_conflicts(self, s, ignore_uid=None):
+        """False se l'utente rinuncia dopo l'avviso di regole nello stesso minuto o entro la finestra dei conflitti."""
+        window = self._conflict_window()
+        found = self.conflict_index.conflicts(s, window, ignore_uid)
+        if not found:
+            return True
+        lines = []
+        for c in found[:5]:
+            when = "stesso minuto" if c.collision else f"a {c.distance} min"
+            lines.append(f"- {c.action} alle {c.time} ({when}, priorità {c.priority})")
+        if len(found) > 5:
+            lines.append(f"- ... altre {len(found) - 5} regole")
+        winner = "questa regola" if all(s.priority > c.priority for c in found) else "la regola con priorità più alta"
+        return Messagebox.show_question(
+            "Conflitto tra pianificazioni",
+            f"Entro {window} minuti sono pianificate anche:\n" + "\n".join(lines) +
+            f"\n\nVerrà eseguita una sola azione per finestra ({winner}). Salvare comunque?"
+        )
+
+    def _bind_shortcuts(self):
+        # Scorciatoie globali
+        try:
+            self.bind('<Control-n>', lambda e: self._add_schedule())
+            self.bind('<F5>', lambda e: self._refresh_table())
+            self.bind('<Return>', lambda e: self._edit_schedule())
+            self.bind('<Delete>', lambda e: self._remove_schedule())
+        except Exception:
+            pass
+    
+    def _get_day_name(self, day_idx):
+        days = ["Lun", "Mar", "Mer", "Gio", "Ven", "Sab", "Dom"]
+        return days[day_idx] if 0 <= day_idx < len(days) else ""
+    
+    def _add_schedule(self):
+        dialog = ScheduleDialog(self)
+        self.wait_window(dialog)
+        
+        if hasattr(dialog, 'result') and dialog.result:
+            # Evita duplicati (stessi giorni, ora e azione)
+            new = dialog.result
+            if not self._check_duplicates(new) or not self._check_conflicts(new):
+                return
+            # Aggiungi, salva e ricarica la tabella
+            self._append_rule(new)
+            self._after_config_change("Pianificazione aggiunta con successo")
+    
+    def _edit_schedule(self):
+        # Modifica la riga selezionata con controllo duplicati
+        if not hasattr(self, 'selected_row') or self.selected_row is None:
+            Messagebox.show_warning("Seleziona una pianificazione da modificare", "Attenzione")
+            return
+        idx = self.selected_row
+        schedules = self.cfg.get('schedules', [])
+        if not (0 <= idx < len(schedules)):
+            Messagebox.show_warning("Selezione non valida", "Attenzione")
+            return
+        dialog = ScheduleDialog(self, schedules[idx])
+        self.wait_window(dialog)
+        if hasattr(dialog, 'result') and dialog.result:
+            updated = dialog.result
+            # Evita duplicati con altri elementi
+            if not (self._check_duplicates(updated, ignore_uid=updated.uid)
+                    and self._check_conflicts(updated, ignore_uid=updated.uid)):
+                return
+            self._replace_rule(idx, updated)
+            self._after_config_change("Pianificazione aggiornata")
+    
+    def _remove_schedule(self):
+        if not hasattr(self, 'selected_row') or self.selected_row is None:
+            Messagebox.show_warning("Seleziona una pianificazione da rimuovere", "Attenzione")
+            return
+        
+        idx = self.selected_row
+        if 0 <= idx < len(self.cfg.get('schedules', [])):
+            if Messagebox.show_question(
+                "Conferma rimozione",
+                "Sei sicuro di voler rimuovere questa pianificazione?"
+            ):
+                self._delete_rule(idx)
+                self._after_config_change("Pianificazione rimossa")
+                self.selected_row = None
+
+    _TRANSFER_FILETYPES = [("JSON Lines", "*.jsonl *.ndjson"), ("CSV", "*.csv"), ("Tutti i file", "*.*")]
+
+    def _import_rules(self):
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(parent=self, title="Importa regole", filetypes=self._TRANSFER_FILETYPES)
+        if not path:
+            return
+        try:
+            with open_text(path, 'r') as stream:
+                report = import_rules(stream, detect_format(path), self.dup_index)
+            find_conflicts(report, self.cfg['schedules'], self._conflict_window())
+        except (OSError, UnicodeDecodeError) as e:
+            Messagebox.show_error("Importazione", f"Impossibile leggere il file: {e}")
+            return
+        if report.accepted:
+            # Un'unica transazione: indici aggiornati in blocco, un salvataggio, un rendering
+            self._extend_rules(report.accepted)
+            self._after_config_change(f"Importate {len(report.accepted)} regole")
+        Messagebox.show_info("Importazione", report.summary())
+
+    def _export_rules(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self, title="Esporta regole", defaultextension=".jsonl",
+                                            filetypes=self._TRANSFER_FILETYPES)
+        if not path:
+            return
+        try:
+            with open_text(path, 'w') as stream:
+                count = export_rules(self.cfg['schedules'], stream, detect_format(path))
+        except OSError as e:
+            Messagebox.show_error("Esportazione", f"Impossibile scrivere il file: {e}")
+            return
+        self.status_var.set(f"Esportate {count} regole")
+
+    def _on_scale_change(self, value: str):
+        # Applica scala UI subito e salva in config
+        try:
+            pct = int(value.replace('%','').strip())
+            scale = max(0.6, min(1.5, pct/100.0))
+            ctk.set_widget_scaling(scale)
+            ctk.set_window_scaling(scale)
+            self.cfg['ui_scale'] = scale
+            prerender_icons((scale,))
+            self._save_config()
+            # Non forziamo un rerender completo: CTk ridisegna i widget con la nuova scala
+        except Exception as e:
+            print('UI scale change error:', e)
+    
+    def _refresh_table(self):
+        # Rirenderizza le cards e aggiorna i contatori
+        if hasattr(self, '_request_render'):
+            self._request_render()
+        self.status_var.set("Vista aggiornata")
+
+    def _save_config(self, flush=False):
+        # Accoda il salvataggio: piu' modifiche ravvicinate diventano una sola scrittura
+        try:
+            self.config_writer.schedule(self.cfg)
+            if flush:
+                self.config_writer.flush()
+        except Exception as e:
+            print('Errore salvataggio configurazione:', e)
+
+    def _after_config_change(self, status_msg: str = ""):
+        """Salva config, ricarica vista e mantiene selezione valida."""
+        self._save_config()
+        self._publish_schedules()
+        # Rirenderizza
+        try:
+            self._request_render()
+        except Exception:
+            pass
+        # Aggiorna stato
+        try:
+            if status_msg:
+                self.status_var.set(status_msg)
+        except Exception:
+            pass
+
+    def _test_countdown(self):
+        # Mostra un semplice test di avviso senza spegnere nulla
+        try:
+            Messagebox.show_info("Test Countdown", "Esempio di avviso: il PC verrebbe spento tra 20 secondi (TEST)")
+        except Exception as e:
+            print("Errore test countdown:", e)
+    
+    def _toggle_autostart(self):
+        enabled = self.autostart_var.get()
+        if set_autostart(enabled):
+            self.status_var.set("Avvio automatico " + ("abilitato" if enabled else "disabilitato"))
+        else:
+            self.autostart_var.set(not enabled)
+            self.status_var.set("Errore durante l'aggiornamento dell'avvio automatico")
+    
+    def _toggle_theme(self):
+        self.theme_mode = "light" if self.theme_mode == "dark" else "dark"
+        ctk.set_appearance_mode(self.theme_mode.capitalize())
+        
+        # Salva la preferenza del tema
+        self.cfg['theme'] = self.theme_mode
+        self._save_config()
+        
+        # Ricarica l'interfaccia per applicare il tema
+        self._setup_ui()
+
+    def _toggle_fullscreen(self):
+        try:
+            if not self.is_fullscreen:
+                # Entra in fullscreen
+                self.is_fullscreen = True
+                # Su Windows fullscreen vero può coprire la taskbar; alternativa è state('zoomed')
+                try:
+                    self.attributes('-fullscreen', True)
+                except Exception:
+                    self.state('zoomed')
+            else:
+                self._exit_fullscreen()
+        except Exception:
+            pass
+
+    def _exit_fullscreen(self):
+        try:
+            self.is_fullscreen = False
+            try:
+                self.attributes('-fullscreen', False)
+            except Exception:
+                self.state('normal')
+            # Ripristina dimensioni fisse e blocca resize
+            self.geometry(f"{self.fixed_width}x{self.fixed_height}")
+            self.minsize(self.fixed_width, self.fixed_height)
+            self.maxsize(self.fixed_width, self.fixed_height)
+            self.resizable(False, False)
+            # Centra nuovamente dopo aver ripristinato la finestra
+            try:
+                self.after(0, self._center_window)
+            except Exception:
+                self._center_window()
+        except Exception:
+            pass
+
+    def _center_window(self):
+        try:
+            # Ottieni l'area di lavoro del monitor corrente (sotto il mouse)
+            left, top, right, bottom = self._get_work_area()
+            aw = max(100, right - left)
+            ah = max(100, bottom - top)
+            # Usa le dimensioni già impostate (non ridimensionare qui)
+            self.update_idletasks()
+            w = self.winfo_width() or self.fixed_width
+            h = self.winfo_height() or self.fixed_height
+            x = left + max(0, (aw - w) // 2)
+            y = top + max(0, (ah - h) // 2)
+            # Sposta soltanto
+            self.geometry(f"+{x}+{y}")
+        except Exception:
+            pass
+    
+    def _get_work_area(self):
+        # Restituisce (left, top, right, bottom) dell'area di lavoro disponibile
+        try:
+            import ctypes
+            from ctypes import wintypes
+            user32 = ctypes.windll.user32
+            # Coordinate del cursore per scegliere il monitor corrente
+            pt = wintypes.POINT()
+            user32.GetCursorPos(ctypes.byref(pt))
+            MONITOR_DEFAULTTONEAREST = 2
+            hmon = user32.MonitorFromPoint(pt, MONITOR_DEFAULTTONEAREST)
+            class MONITORINFO(ctypes.Structure):
+                _fields_ = [
+                    ("cbSize", wintypes.DWORD),
+                    ("rcMonitor", wintypes.RECT),
+                    ("rcWork", wintypes.RECT),
+                    ("dwFlags", wintypes.DWORD),
+                ]
+            mi = MONITORINFO()
+            mi.cbSize = ctypes.sizeof(MONITORINFO)
+            if user32.GetMonitorInfoW(hmon, ctypes.byref(mi)):
+                # rcWork esclude taskbar
+                return mi.rcWork.left, mi.rcWork.top, mi.rcWork.right, mi.rcWork.bottom
+        except Exception:
+            pass
+        # Fallback: intero schermo
+        return 0, 0, self.winfo_screenwidth(), self.winfo_screenheight()
+    
+    def _start_scheduler(self):
+        if self.scheduler:
+            if self.scheduler.is_alive():
+                self.scheduler.stop()
+                self.scheduler.join(timeout=2.0)
+            # Il pool del vecchio scheduler non riceve piu' azioni: i suoi thread non restano appesi
+            self.scheduler.executor.shutdown(wait=False)
+        
+        self.stop_event = threading.Event()
+        executor = ActionExecutor(create_backend(self.action_backend or self.cfg.get('action_backend')))
+        self.scheduler = SchedulerThread(self.stop_event, app=self, schedules=self.cfg.get('schedules', []),
+                                         executor=executor, conflict_window=self._conflict_window())
+        self.scheduler.start()
+
+    def _publish_schedules(self):
+        # Le regole sono cambiate: lo scheduler riceve una copia immutabile (mai la lista
+        # modificata dalla UI) e ricalcola la prossima scadenza
+        if getattr(self, 'scheduler', None):
+            self.scheduler.publish(self.cfg.get('schedules', []), self._conflict_window())
+            self._refresh_upcoming()
+
+    def _start_config_watcher(self):
+        self.config_watcher = ConfigWatcher(
+            CONFIG_FILE,
+            # Chiamato dal thread del watcher: l'applicazione avviene nel main thread Tk
+            lambda cfg: self.after(0, lambda: self._apply_reloaded_config(cfg)),
+            is_own_write=self.config_writer.is_own_write,
+        )
+        self.config_watcher.start()
+
+    def _apply_reloaded_config(self, cfg):
+        """Sostituisce la config in uso con quella (gia' validata) letta da disco."""
+        cfg.setdefault('start_minimized_tray', False)
+        # Un salvataggio ancora in coda porterebbe su disco lo stato UI precedente
+        self.config_writer.rebase(cfg)
+        self.cfg = cfg
+        self._reset_rules()
+        if not (isinstance(self.selected_row, int) and 0 <= self.selected_row < len(cfg.get('schedules', []))):
+            self.selected_row = None
+        try:
+            self.start_min_tray_var.set(bool(cfg.get('start_minimized_tray', False)))
+        except Exception:
+            pass
+        self._publish_schedules()
+        self._request_render()
+        self.status_var.set("Configurazione ricaricata da disco")
+    
+    def _create_tray_icon(self):
+        try:
+            import pystray
+        except ImportError:
+            print("System tray functionality not available (pystray not installed)")
+            return
+        try:
+            # Icona monocromatica coerente con la palette (dalla cache delle icone)
+            image = tray_image(float(self.cfg.get('ui_scale', 1.0)))
+            if image is None:
+                print("System tray functionality not available (PIL not installed)")
+                return
+            menu = pystray.Menu(
+                pystray.MenuItem("Apri", lambda icon=None, item=None: self._show_window()),
+                pystray.MenuItem("Esci", lambda icon=None, item=None: self._on_quit())
+            )
+            self.tray_icon = pystray.Icon("ShutdownScheduler", image, "Shutdown Scheduler", menu)
+            self.tray_icon.run_detached()
+        except Exception as e:
+            print("Error creating tray icon:", e)
+
+    def _show_window(self, icon=None, item=None):
+        """Mostra la finestra principale dal tray o altrove."""
+        try:
+            self.deiconify()
+            self.lift()
+            self.focus_force()
+        except Exception:
+            pass
+        self.focus_force()
+    
+    def _on_close(self):
+        if getattr(self, 'tray_icon', None):
+            # Nascondi la finestra invece di chiudere l'applicazione
+            self.withdraw()
+        else:
+            # Se la system tray non è disponibile, chiudi l'applicazione
+            self._on_quit()
+    
+    def _on_quit(self):
+        # Esegui lo shutdown in modo sicuro dal main thread Tk
+        def _shutdown():
+            if getattr(self, 'tray_icon', None):
+                try:
+                    self.tray_icon.visible = False
+                    self.tray_icon.stop()
+                except Exception:
+                    pass
+            # Ferma lo scheduler
+            try:
+                if getattr(self, 'scheduler', None):
+                    if self.scheduler.is_alive():
+                        self.scheduler.stop()
+                        self.scheduler.join(timeout=2.0)
+                    self.scheduler.executor.shutdown(wait=False)
+            except Exception:
+                pass
+            # Scrivi su disco le modifiche ancora in coda
+            try:
+                if getattr(self, 'config_watcher', None):
+                    self.config_watcher.stop()
+                self.config_writer.stop()
+            except Exception:
+                pass
+            stop_exporters(getattr(self, 'metrics_exporters', ()))
+            # Chiudi l'app
+            try:
+                self.destroy()
+            except Exception:
+                pass
+        try:
+            self.after(0, _shutdown)
+        except Exception:
+            _shutdown()
+
+# Funzione principale
+def main(action_backend=None):
+    # Crea l'applicazione
+    app = ModernShutdownScheduler(action_backend=action_backend)
+    # Avvia il loop principale
+    app.mainloop()
@@ -0,0 +1,97 @@
+"""
+Heatmap settimanale del carico (giorno x fascia oraria) per il pannello laterale.
+
+La griglia si calcola con un solo passaggio sugli slot occupati di uno
+`ScheduleIndex` (regole gia' compilate: solo quelle abilitate) e viene disegnata
+in un'unica immagine PIL, tenuta in cache finche' le regole non cambiano.
+PIL si importa solo al momento del disegno.
+"""
+
+from .engine import MINUTES_PER_DAY
+from .theme import ACCENT_COLOR, CARD_BORDER, MUTED_TEXT
+
+DAY_LABELS = ("L", "M", "M", "G", "V", "S", "D")
+# Minuti per colonna: 60 = griglia 7x24
+BUCKET_MINUTES = 60
+CELL_SIZE = (10, 12)
+GUTTER = (14, 12)  # spazio per le etichette dei giorni (sinistra) e delle ore (sotto)
+HOUR_TICKS = (0, 6, 12, 18)
+
+class LoadGrid:
+    """Esecuzioni per giorno e fascia: `cells` e' una lista piatta di 7 x `columns` valori."""
+
+    __slots__ = ('columns', 'bucket_minutes', 'cells')
+
+    def __init__(self, index, bucket_minutes=BUCKET_MINUTES):
+        columns = MINUTES_PER_DAY // bucket_minutes
+        cells = [0] * (7 * columns)
+        slots = index.slots
+        for minute in index.minutes:
+            day, rest = divmod(minute, MINUTES_PER_DAY)
+            cells[day * columns + rest // bucket_minutes] += len(slots[minute])
+        self.columns = columns
+        self.bucket_minutes = bucket_minutes
+        self.cells = cells
+
+    def day_totals(self):
+        c = self.columns
+        return [sum(self.cells[d * c:(d + 1) * c]) for d in range(7)]
+
+    def peak(self):
+        return max(self.cells) if self.cells else 0
+
+def _hex_rgb(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+def _blend(low, high, t):
+    return tuple(round(a + (b - a) * t) for a, b in zip(low, high))
+
+def image_size(grid, cell=CELL_SIZE):
+    return GUTTER[0] + grid.columns * cell[0], 7 * cell[1] + GUTTER[1]
+
+def render(grid, scale=1.0, cell=CELL_SIZE):
+    """Immagine PIL della griglia disegnata a `scale`; None senza PIL."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return None
+    width, height = image_size(grid, cell)
+    cw, ch = cell[0] * scale, cell[1] * scale
+    gx = GUTTER[0] * scale
+    img = Image.new("RGBA", (max(1, round(width * scale)), max(1, round(height * scale))), (0, 0, 0, 0))
+    d = ImageDraw.Draw(img)
+    empty, full, text = _hex_rgb(CARD_BORDER), _hex_rgb(ACCENT_COLOR), _hex_rgb(MUTED_TEXT)
+    peak = grid.peak()
+    gap = max(1, round(scale))
+    for day in range(7):
+        y = day * ch
+        d.text((1, y + (ch - 10 * scale) / 2), DAY_LABELS[day], fill=text)
+        row = grid.cells[day * grid.columns:(day + 1) * grid.columns]
+        for col, count in enumerate(row):
+            # Anche una sola esecuzione resta ben visibile rispetto alle celle vuote
+            color = _blend(empty, full, 0.35 + 0.65 * count / peak) if count else empty
+            x = gx + col * cw
+            d.rectangle((round(x), round(y), round(x + cw) - gap, round(y + ch) - gap), fill=color)
+    hours_per_col = grid.bucket_minutes / 60
+    for hour in HOUR_TICKS:
+        d.text((round(gx + hour / hours_per_col * cw), round(7 * ch + 1)), str(hour), fill=text)
+    return img
+
+class HeatmapCache:
+    """Ultima griglia e immagine calcolate, riusate finche' la chiave (generazione delle regole) non cambia."""
+
+    def __init__(self, bucket_minutes=BUCKET_MINUTES):
+        self.bucket_minutes = bucket_minutes
+        self._key = None
+        self.grid = None
+        self.image = None
+
+    def update(self, key, index, scale=1.0):
+        """Ricalcola griglia e immagine solo se `key` o la scala sono cambiate; True se ricalcolate."""
+        if self._key == (key, scale) and self.grid is not None:
+            return False
+        self.grid = LoadGrid(index, self.bucket_minutes)
+        self.image = render(self.grid, scale)
+        self._key = (key, scale)
+        return True
@@ -0,0 +1,146 @@
+"""
+Icone della toolbar e della tray disegnate con PIL, memorizzate in una cache LRU
+di processo indicizzata per (tipo, dimensione, colore, scala).
+
+All'avvio `prerender()` disegna in un thread in background le icone alle scale
+supportate: toolbar e tray le trovano gia' pronte, senza disegno PIL sul percorso
+critico. PIL (e CustomTkinter per le `CTkImage`) si importano solo quando servono.
+"""
+
+import threading
+import collections
+
+from .theme import ACCENT_COLOR
+
+TOOLBAR_ICONS = ("add", "edit", "remove")
+TOOLBAR_ICON_SIZE = (20, 20)
+TRAY_ICON_SIZE = 24
+# Scale UI pre-renderizzate all'avvio (il selettore va da 60% a 150%)
+SUPPORTED_SCALES = (1.0, 1.25, 1.5, 0.75)
+CACHE_SIZE = 64
+
+def _draw_toolbar(d, kind, w, h, c):
+    thick = max(2, min(w, h)//10)
+    pad = max(2, thick)
+    if kind == "add":
+        # Croce '+' centrata
+        d.rectangle((w//2 - thick//2, pad, w//2 + thick//2, h - pad), fill=c)
+        d.rectangle((pad, h//2 - thick//2, w - pad, h//2 + thick//2), fill=c)
+    elif kind == "edit":
+        # Matita diagonale
+        d.line((pad, h - pad, w - pad, pad), fill=c, width=thick)
+        # Punta
+        d.polygon([(w - pad - thick, pad), (w - pad, pad), (w - pad, pad + thick)], fill=c)
+    elif kind == "remove":
+        # Cestino stilizzato
+        # corpo
+        d.rectangle((pad+2, pad+6, w - pad-2, h - pad), outline=c, width=thick)
+        # coperchio
+        d.rectangle((pad, pad+2, w - pad, pad+4), fill=c)
+        # manico
+        d.line((w//2, pad, w//2, pad+2), fill=c, width=thick)
+    else:
+        # fallback: cerchio
+        d.ellipse((pad, pad, w - pad, h - pad), outline=c, width=thick)
+
+def _draw_tray(dc, s, c):
+    # cerchio esterno accent
+    dc.ellipse((1, 1, s-2, s-2), outline=c, width=max(2, s//12))
+    # simbolo power interno
+    cx, cy = s//2, s//2
+    r = s//4
+    dc.arc((cx-r, cy-r, cx+r, cy+r), start=300, end=240, fill=c, width=max(2, s//14))
+    # lineetta centrale
+    dc.line((cx, cy-r-1, cx, cy-r//2), fill=c, width=max(2, s//14))
+
+def _render(kind, size, color, scale):
+    from PIL import Image, ImageDraw
+    w, h = size
+    pw, ph = max(1, round(w * scale)), max(1, round(h * scale))
+    if kind == "tray":
+        pw = ph = max(16, min(128, pw))
+    img = Image.new("RGBA", (pw, ph), (0, 0, 0, 0))
+    d = ImageDraw.Draw(img)
+    if kind == "tray":
+        _draw_tray(d, pw, color)
+    else:
+        _draw_toolbar(d, kind, pw, ph, color)
+    return img
+
+class IconCache:
+    """Cache LRU thread-safe delle immagini PIL gia' disegnate."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._images = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind, size, color, scale=1.0):
+        """Immagine PIL di `size` punti logici disegnata a `scale`; None senza PIL."""
+        key = (kind, tuple(size), color, round(scale, 2))
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+                return img
+        try:
+            img = _render(*key)
+        except ImportError:
+            return None
+        with self._lock:
+            # Se un altro thread l'ha disegnata nel frattempo, tieni la prima
+            img = self._images.setdefault(key, img)
+            self._images.move_to_end(key)
+            while len(self._images) > self.maxsize:
+                self._images.popitem(last=False)
+        return img
+
+    def __len__(self):
+        return len(self._images)
+
+ICONS = IconCache()
+
+def icon_set(color="#FFFFFF"):
+    """Icone usate dall'app: toolbar nel colore indicato e icona della tray."""
+    keys = [(kind, TOOLBAR_ICON_SIZE, color) for kind in TOOLBAR_ICONS]
+    keys.append(("tray", (TRAY_ICON_SIZE, TRAY_ICON_SIZE), ACCENT_COLOR))
+    return keys
+
+def prerender(scales=SUPPORTED_SCALES, color="#FFFFFF"):
+    """Disegna in background le icone alle `scales` indicate (la prima ha precedenza)."""
+    def _work():
+        for scale in scales:
+            for kind, size, c in icon_set(color):
+                if ICONS.get(kind, size, c, scale) is None:
+                    return  # PIL non disponibile
+    thread = threading.Thread(target=_work, name="IconPrerender", daemon=True)
+    thread.start()
+    return thread
+
+def tray_image(scale=1.0):
+    return ICONS.get("tray", (TRAY_ICON_SIZE, TRAY_ICON_SIZE), ACCENT_COLOR, scale)
+
+_ctk_images = {}
+
+def create_toolbar_icon(kind: str, size=TOOLBAR_ICON_SIZE, color="#FFFFFF", scale=1.0):
+    """Ritorna un ctk.CTkImage con icona disegnata via PIL. In caso PIL mancante, ritorna None.
+
+    L'immagine sorgente e' disegnata gia' alla scala UI e la `CTkImage` e' condivisa
+    tra le chiamate con gli stessi parametri (va usata dal thread Tk).
+    """
+    key = (kind, tuple(size), color, round(scale, 2))
+    cached = _ctk_images.get(key)
+    if cached is not None:
+        return cached
+    img = ICONS.get(kind, size, color, scale)
+    if img is None:
+        return None
+    try:
+        import customtkinter as ctk
+        cached = ctk.CTkImage(light_image=img, dark_image=img, size=tuple(size))
+    except Exception:
+        return None
+    if len(_ctk_images) >= CACHE_SIZE:
+        del _ctk_images[next(iter(_ctk_images))]
+    _ctk_images[key] = cached
+    return cached
@@ -0,0 +1,285 @@
+"""
+Metriche di funzionamento (scheduler, azioni, GUI, salvataggi) in formato
+testuale Prometheus, senza dipendenze esterne.
+
+Le metriche vivono in un registro di processo (`METRICS`) e si espongono in due modi,
+entrambi facoltativi e configurati in config.json:
+- `metrics_textfile`: file `.prom` riscritto in modo atomico ogni `metrics_interval`
+  secondi, per il textfile collector di node-exporter;
+- `metrics_port`: endpoint HTTP `/metrics` in ascolto solo su 127.0.0.1.
+"""
+
+import os
+import time
+import bisect
+import tempfile
+import threading
+import contextlib
+from pathlib import Path
+
+DEFAULT_INTERVAL = 15.0
+HTTP_HOST = "127.0.0.1"
+
+# Limiti dei bucket (secondi) degli istogrammi
+EVALUATION_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+ACTION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+UI_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Senza etichette la serie esiste da subito (0 invece di assente)
+            self._values[()] = self._zero()
+
+    def _zero(self):
+        return 0
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: etichette attese {self.labelnames}, ricevute {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _zero(self):
+        # Conteggi per bucket (non cumulativi), somma, numero di osservazioni
+        return [[0] * len(self.buckets), 0.0, 0]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        pos = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = self._zero()
+            if pos < len(self.buckets):
+                state[0][pos] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    """Metriche registrate, in ordine di creazione."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Tutte le metriche nel formato testuale Prometheus 0.0.4."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+METRICS = Registry()
+
+WAKEUPS = METRICS.register(Counter(
+    "shutdown_scheduler_wakeups_total", "Scheduler loop wakeups."))
+EVALUATION_SECONDS = METRICS.register(Histogram(
+    "shutdown_scheduler_evaluation_seconds", "Time spent evaluating rules on each wakeup.",
+    buckets=EVALUATION_BUCKETS))
+RULES = METRICS.register(Gauge(
+    "shutdown_scheduler_rules", "Rules in the armed rule set.", ("state",)))
+NEXT_FIRE = METRICS.register(Gauge(
+    "shutdown_scheduler_next_fire_timestamp_seconds", "Unix time of the next scheduled action (0 = none)."))
+FIRE_LATENCY = METRICS.register(Histogram(
+    "shutdown_scheduler_fire_latency_seconds", "Delay between the scheduled minute and the action being submitted.",
+    ("action",), buckets=LATENCY_BUCKETS))
+MISSED = METRICS.register(Counter(
+    "shutdown_scheduler_missed_total", "Scheduled minutes missed while the scheduler was not running.",
+    ("policy", "run")))
+SUPPRESSED = METRICS.register(Counter(
+    "shutdown_scheduler_suppressed_total", "Actions skipped by conflict resolution.", ("action",)))
+ACTION_SECONDS = METRICS.register(Histogram(
+    "shutdown_scheduler_action_duration_seconds", "Duration of the power action command.",
+    ("action", "backend"), buckets=ACTION_BUCKETS))
+ACTION_RESULTS = METRICS.register(Counter(
+    "shutdown_scheduler_action_results_total",
+    "Power action outcomes: exit code, or timeout/error/rejected.", ("action", "backend", "outcome")))
+RENDER_SECONDS = METRICS.register(Histogram(
+    "shutdown_scheduler_render_seconds", "Duration of a rule list render in the GUI.", buckets=UI_BUCKETS))
+SAVE_SECONDS = METRICS.register(Histogram(
+    "shutdown_scheduler_config_save_seconds", "Duration of a config save (serialization and atomic write).",
+    buckets=UI_BUCKETS))
+
+def write_textfile(path, registry=METRICS):
+    """Scrive le metriche in `path` con un rename atomico (il collector non legge mai file a meta')."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix="." + path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(registry.render())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+class TextfileExporter(threading.Thread):
+    """Riscrive periodicamente il file `.prom`; `stop()` fa un'ultima scrittura."""
+
+    def __init__(self, path, interval=DEFAULT_INTERVAL, registry=METRICS):
+        super().__init__(name="MetricsTextfile", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                write_textfile(self.path, self.registry)
+            except OSError as e:
+                print('Errore scrittura metriche:', e)
+            if self._stop_event.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=5.0)
+
+class MetricsServer:
+    """Endpoint HTTP `/metrics` solo su localhost, servito da un thread in background."""
+
+    def __init__(self, port, registry=METRICS, host=HTTP_HOST):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # niente log per ogni scrape
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsHTTP", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+def start_exporters(cfg):
+    """Avvia gli esportatori abilitati in `cfg`; ritorna la lista da fermare con `stop()`."""
+    exporters = []
+    textfile = cfg.get('metrics_textfile')
+    if textfile:
+        try:
+            interval = max(1.0, float(cfg.get('metrics_interval', DEFAULT_INTERVAL)))
+        except (TypeError, ValueError):
+            interval = DEFAULT_INTERVAL
+        exporter = TextfileExporter(textfile, interval)
+        exporter.start()
+        exporters.append(exporter)
+    port = cfg.get('metrics_port')
+    if port:
+        try:
+            server = MetricsServer(int(port))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Endpoint metriche non avviato (porta {port!r}): {e}")
+        else:
+            server.start()
+            exporters.append(server)
+            print(f"Metriche su http://{HTTP_HOST}:{server.port}/metrics")
+    return exporters
+
+def stop_exporters(exporters):
+    for exporter in exporters:
+        try:
+            exporter.stop()
+        except Exception as e:
+            print('Errore arresto metriche:', e)
@@ -0,0 +1,117 @@
+"""
+Modello compatto e immutabile di una regola di pianificazione.
+
+In memoria i giorni sono una maschera a 7 bit (bit 0 = lunedi') e l'orario e'
+il minuto del giorno; la conversione da/verso il formato JSON (`days` come lista,
+`time` come "HH:MM") avviene solo al caricamento e al salvataggio.
+"""
+
+import itertools
+
+ALL_DAYS_MASK = 0b1111111
+WEEKDAYS_MASK = 0b0011111  # Lun-Ven
+WEEKEND_MASK = 0b1100000   # Sab-Dom
+
+# Campi JSON gestiti dal modello; gli altri vengono conservati cosi' come sono
+_KNOWN_KEYS = ('days', 'time', 'action', 'enabled', 'missed_policy', 'missed_window', 'priority')
+
+_uids = itertools.count(1)
+
+def days_to_mask(days):
+    mask = 0
+    for day in days:
+        mask |= 1 << day
+    return mask
+
+def mask_to_days(mask):
+    return tuple(day for day in range(7) if mask >> day & 1)
+
+class Schedule:
+    """Regola immutabile: per modificarla si crea una copia con `replace()`.
+
+    `uid` identifica la regola per tutta la vita del processo (non viene salvato):
+    `replace()` lo conserva, quindi viste e indici possono seguire la stessa
+    regola anche quando ne cambia lo stato.
+    """
+
+    __slots__ = ('uid', 'day_mask', 'minute', 'action', 'enabled', 'missed_policy', 'missed_window', 'priority',
+                 'extra')
+
+    def __init__(self, day_mask, minute, action, enabled=True, missed_policy='skip', missed_window=15,
+                 priority=0, extra=(), uid=None):
+        set_ = object.__setattr__
+        set_(self, 'uid', uid if uid is not None else next(_uids))
+        set_(self, 'day_mask', day_mask)
+        set_(self, 'minute', minute)
+        set_(self, 'action', action)
+        set_(self, 'enabled', enabled)
+        set_(self, 'missed_policy', missed_policy)
+        set_(self, 'missed_window', missed_window)
+        # In caso di conflitto (regole nella stessa finestra) vince la priorita' piu' alta
+        set_(self, 'priority', priority)
+        set_(self, 'extra', extra)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Schedule e' immutabile: usa replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Schedule e' immutabile")
+
+    @classmethod
+    def from_dict(cls, data):
+        """Da regola JSON gia' normalizzata (vedi `schema.normalize_rule`)."""
+        hours, minutes = map(int, data['time'].split(':'))
+        extra = tuple((k, v) for k, v in data.items() if k not in _KNOWN_KEYS)
+        return cls(
+            days_to_mask(data['days']), hours * 60 + minutes, data['action'], data['enabled'],
+            data['missed_policy'], data['missed_window'], data['priority'], extra,
+        )
+
+    def to_dict(self):
+        data = {
+            'days': list(self.days),
+            'time': self.time,
+            'action': self.action,
+            'enabled': self.enabled,
+            'missed_policy': self.missed_policy,
+            'missed_window': self.missed_window,
+            'priority': self.priority,
+        }
+        data.update(self.extra)
+        return data
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return Schedule(**fields)
+
+    @property
+    def days(self):
+        return mask_to_days(self.day_mask)
+
+    @property
+    def time(self):
+        return f"{self.minute // 60:02d}:{self.minute % 60:02d}"
+
+    @property
+    def slot_key(self):
+        """Giorni, orario e azione: due regole con la stessa chiave sono duplicate."""
+        return (self.day_mask, self.minute, self.action)
+
+    def _values(self):
+        return (self.day_mask, self.minute, self.action, self.enabled,
+                self.missed_policy, self.missed_window, self.priority, self.extra)
+
+    def __eq__(self, other):
+        if not isinstance(other, Schedule):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        # `extra` conserva valori JSON arbitrari (anche liste/dict, non hashabili):
+        # resta nel confronto ma non nell'hash
+        return hash(self._values()[:-1])
+
+    def __repr__(self):
+        return (f"Schedule(days={list(self.days)}, time={self.time!r}, action={self.action!r}, "
+                f"enabled={self.enabled})")
@@ -0,0 +1,107 @@
+"""
+Profilo dei tempi di import all'avvio (`--profile-imports`).
+
+Simile a `python -X importtime`, ma funziona anche nell'eseguibile PyInstaller
+e produce un riepilogo: moduli piu' costosi (tempo proprio e cumulativo) e
+totale per pacchetto di primo livello.
+"""
+
+import sys
+import time
+import importlib
+
+class _TimedLoader:
+    """Avvolge il loader originale misurando `exec_module`; il resto e' delegato."""
+
+    def __init__(self, profiler, loader):
+        self._profiler = profiler
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__)
+
+class ImportProfiler:
+    """Meta path finder che registra il costo di import di ogni modulo caricato."""
+
+    def __init__(self):
+        # nome modulo -> (tempo proprio, tempo cumulativo) in secondi
+        self.records = {}
+        self._stack = []
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            pass
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(self, spec.loader)
+                return spec
+        return None
+
+    def _enter(self):
+        # [istante di inizio, tempo speso negli import annidati]
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _leave(self, name):
+        started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        self.records[name] = (cumulative - children, cumulative)
+        if self._stack:
+            self._stack[-1][1] += cumulative
+
+    def report(self, limit=25):
+        """Riepilogo testuale dei moduli piu' costosi e dei pacchetti di primo livello."""
+        total = sum(own for own, _ in self.records.values())
+        packages = {}
+        for name, (own, _) in self.records.items():
+            top = name.split('.', 1)[0]
+            packages[top] = packages.get(top, 0.0) + own
+        lines = [f"Import profile: {len(self.records)} moduli, {total * 1000:.1f} ms totali", ""]
+        lines.append(f"{'proprio ms':>10} {'cumul. ms':>10}  modulo")
+        ranked = sorted(self.records.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (own, cumulative) in ranked[:limit]:
+            lines.append(f"{own * 1000:10.2f} {cumulative * 1000:10.2f}  {name}")
+        lines += ["", f"{'totale ms':>10} {'quota':>10}  pacchetto"]
+        for top, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            share = own / total * 100 if total else 0.0
+            lines.append(f"{own * 1000:10.2f} {share:9.1f}%  {top}")
+        return "\n".join(lines)
+
+def profile_imports(module_name, limit=25, output=None):
+    """Importa `module_name` (e tutto cio' che trascina) misurandone il costo.
+
+    Il riepilogo va su `output` (un percorso) oppure su stdout.
+    """
+    profiler = ImportProfiler()
+    profiler.install()
+    try:
+        importlib.import_module(module_name)
+    finally:
+        profiler.uninstall()
+    text = profiler.report(limit)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return profiler
@@ -0,0 +1,110 @@
+"""
+Schema della configurazione: versione, migrazioni ordinate e validazione.
+
+La validazione avviene una sola volta al caricamento: le regole in ingresso
+diventano regole normalizzate (giorni 0-6 ordinati e univoci, orario "HH:MM",
+azione nota, campi opzionali con i valori di default) e i percorsi critici
+(scheduler, rendering, ordinamento) possono fidarsi dei dati senza ricontrollarli.
+Le regole non valide non vengono perse: finiscono in `invalid_schedules`.
+"""
+
+from .engine import MISSED_POLICIES, MISSED_SKIP, DEFAULT_MISSED_WINDOW, DEFAULT_CONFLICT_WINDOW
+
+SCHEMA_VERSION = 1
+ACTIONS = ('shutdown', 'hibernate')
+
+def _migrate_unversioned(cfg):
+    # Config precedenti al versionamento: rendi espliciti i default delle regole
+    for rule in cfg.get('schedules', []):
+        if isinstance(rule, dict):
+            rule.setdefault('enabled', True)
+            rule.setdefault('missed_policy', MISSED_SKIP)
+    return cfg
+
+# (versione di partenza, funzione) in ordine: ognuna porta alla versione successiva
+MIGRATIONS = [
+    (0, _migrate_unversioned),
+]
+
+def migrate_config(cfg):
+    """Applica in ordine le migrazioni mancanti fino a SCHEMA_VERSION."""
+    version = cfg.get('schema_version', 0)
+    if not isinstance(version, int) or version < 0:
+        raise ValueError(f"schema_version non valida: {version!r}")
+    if version > SCHEMA_VERSION:
+        print(f"Configurazione con schema {version} piu' recente di quello supportato ({SCHEMA_VERSION})")
+        return cfg
+    for from_version, migrate in MIGRATIONS:
+        if from_version >= version:
+            cfg = migrate(cfg)
+    cfg['schema_version'] = SCHEMA_VERSION
+    return cfg
+
+def normalize_rule(raw):
+    """Ritorna `(regola normalizzata, None)` oppure `(None, motivo)` se la regola non e' valida."""
+    if not isinstance(raw, dict):
+        return None, "non e' un oggetto"
+    days = raw.get('days')
+    if not isinstance(days, list) or not days:
+        return None, "nessun giorno indicato"
+    if any(isinstance(d, bool) or not isinstance(d, int) or not 0 <= d <= 6 for d in days):
+        return None, f"giorni non validi {days!r}"
+    time_str = raw.get('time')
+    try:
+        hours, minutes = map(int, time_str.split(':'))
+        if not (0 <= hours <= 23 and 0 <= minutes <= 59):
+            raise ValueError
+    except (ValueError, AttributeError):
+        return None, f"orario non valido {time_str!r}"
+    action = raw.get('action')
+    if action not in ACTIONS:
+        return None, f"azione sconosciuta {action!r}"
+    policy = raw.get('missed_policy', MISSED_SKIP)
+    if policy not in MISSED_POLICIES:
+        return None, f"politica per le scadenze mancate sconosciuta {policy!r}"
+    window = raw.get('missed_window', DEFAULT_MISSED_WINDOW)
+    if isinstance(window, bool) or not isinstance(window, int) or window < 0:
+        return None, f"missed_window non valida {window!r}"
+    enabled = raw.get('enabled', True)
+    if not isinstance(enabled, bool):
+        # Niente conversioni: "false" come stringa riattiverebbe una regola disattivata
+        return None, f"enabled non valido {enabled!r}"
+    priority = raw.get('priority', 0)
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        return None, f"priority non valida {priority!r}"
+    rule = dict(raw)
+    rule.update({
+        'days': sorted(set(days)),
+        'time': f"{hours:02d}:{minutes:02d}",
+        'action': action,
+        'enabled': enabled,
+        'missed_policy': policy,
+        'missed_window': window,
+        'priority': priority,
+    })
+    return rule, None
+
+def validate_config(cfg):
+    """Normalizza tutte le regole in un solo passaggio.
+
+    Ritorna `(cfg, problemi)`: le regole valide restano in `schedules`, quelle
+    scartate si aggiungono a `invalid_schedules`; `problemi` le descrive.
+    """
+    valid = []
+    invalid = list(cfg.get('invalid_schedules', []))
+    problems = []
+    for pos, raw in enumerate(cfg.get('schedules', [])):
+        rule, error = normalize_rule(raw)
+        if rule is None:
+            invalid.append(raw)
+            problems.append(f"regola #{pos + 1}: {error}")
+        else:
+            valid.append(rule)
+    cfg['schedules'] = valid
+    conflict_window = cfg.get('conflict_window', DEFAULT_CONFLICT_WINDOW)
+    if isinstance(conflict_window, bool) or not isinstance(conflict_window, int) or conflict_window < 0:
+        problems.append(f"conflict_window non valida {conflict_window!r}, uso {DEFAULT_CONFLICT_WINDOW}")
+        cfg['conflict_window'] = DEFAULT_CONFLICT_WINDOW
+    if invalid:
+        cfg['invalid_schedules'] = invalid
+    return cfg, problems
@@ -0,0 +1,110 @@
+"""
+Simulazione delle regole su un intervallo di date, senza attendere l'orologio.
+
+Usa lo stesso `ScheduleIndex` dello scheduler (stesse regole di match: regola
+abilitata, giorni, orario), quindi i risultati coincidono con quelli del motore.
+Invece di avanzare un minuto alla volta, gli slot occupati della settimana
+vengono convertiti una volta in offset e ripetuti per ogni settimana dell'intervallo:
+un anno di regole si calcola in pochi millisecondi.
+
+Con `conflict_window` si applica anche la risoluzione dei conflitti dello
+scheduler (una sola azione per finestra, vince la priorita' piu' alta).
+
+Gli istanti sono `datetime` locali senza fuso, come in `SchedulerThread`.
+"""
+
+import bisect
+import datetime
+import itertools
+
+from .engine import MINUTES_PER_WEEK, ScheduleIndex
+
+_MINUTE = datetime.timedelta(minutes=1)
+_WEEK = datetime.timedelta(weeks=1)
+
+def week_start(moment):
+    """Lunedi' alle 00:00 della settimana di `moment`."""
+    base = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return base - datetime.timedelta(days=base.weekday())
+
+def _minute_bounds(origin, start, end):
+    # Minuti [lo, hi) dall'origine: un minuto conta se il suo inizio e' in [start, end)
+    lo = -(-(start - origin) // _MINUTE)
+    hi = -(-(end - origin) // _MINUTE)
+    return lo, hi
+
+def _week_slices(minutes, lo, hi):
+    """Per ogni settimana toccata da [lo, hi): (settimana, primo e ultimo+1 slot occupato)."""
+    first_week, last_week = lo // MINUTES_PER_WEEK, (hi - 1) // MINUTES_PER_WEEK
+    full = len(minutes)
+    for week in range(first_week, last_week + 1):
+        base = week * MINUTES_PER_WEEK
+        a = bisect.bisect_left(minutes, lo - base) if week == first_week else 0
+        b = bisect.bisect_left(minutes, hi - base) if week == last_week else full
+        if a < b:
+            yield week, a, b
+
+def _outranked(events, schedules, pos, limit):
+    # Regola con priorita' maggiore tra gli eventi successivi fino a `limit`
+    priority = schedules[events[pos][1]].priority
+    for when, idx in itertools.islice(events, pos + 1, None):
+        if when > limit:
+            return False
+        if schedules[idx].priority > priority:
+            return True
+    return False
+
+def resolve_conflicts(events, schedules, conflict_window, last_action=None):
+    """Filtra `events` come `SchedulerThread`: al massimo un'azione ogni `conflict_window` minuti.
+
+    Una regola cede il posto a una di priorita' maggiore in arrivo nella finestra;
+    dopo un'azione le altre regole della finestra vengono saltate. `last_action` e'
+    l'istante di un'azione eseguita prima degli eventi.
+    """
+    window = datetime.timedelta(minutes=conflict_window)
+    kept = []
+    last = last_action
+    for pos, (when, idx) in enumerate(events):
+        if last is not None and last <= when <= last + window:
+            continue
+        if not _outranked(events, schedules, pos, when + window):
+            kept.append((when, idx))
+            last = when
+    return kept
+
+def _events(index, start, end):
+    minutes = index.minutes
+    origin = week_start(start)
+    lo, hi = _minute_bounds(origin, start, end)
+    if lo >= hi:
+        return []
+    # Offset e regole di ogni slot occupato, calcolati una volta per tutte le settimane
+    offsets = [datetime.timedelta(minutes=m) for m in minutes]
+    rules = [index.slots[m] for m in minutes]
+    events = []
+    append = events.append
+    for week, a, b in _week_slices(minutes, lo, hi):
+        base = origin + week * _WEEK
+        for i in range(a, b):
+            when = base + offsets[i]
+            for idx in rules[i]:
+                append((when, idx))
+    return events
+
+def simulate(schedules, start, end, index=None, conflict_window=None, last_action=None):
+    """Tutte le esecuzioni in [start, end) come lista di `(istante, indice regola)`.
+
+    Ordinate per istante e, nello stesso minuto, nell'ordine delle regole
+    (lo stesso in cui le esegue lo scheduler). Con `conflict_window` le regole
+    vicine alla fine dell'intervallo cedono anche a quelle di priorita' maggiore
+    oltre `end`, come nello scheduler. `last_action` e' l'istante dell'ultima azione
+    eseguita prima di `start`; senza, l'intervallo parte come uno scheduler appena armato.
+    """
+    index = index or ScheduleIndex(schedules)
+    if not index.minutes or end <= start:
+        return []
+    if conflict_window is None:
+        return _events(index, start, end)
+    # La ricerca di regole con priorita' maggiore guarda fino a `conflict_window` minuti avanti
+    events = _events(index, start, end + conflict_window * _MINUTE)
+    return [event for event in resolve_conflicts(events, schedules, conflict_window, last_action) if event[0] < end]
@@ -0,0 +1,125 @@
+"""
+Ordinamento delle regole per la lista: chiavi precalcolate e ordini mantenuti.
+
+Le chiavi di ordinamento di una regola (giorni, orario, azione, stato) sono
+interi calcolati una volta quando la regola entra nell'indice. Per ogni
+ordinamento richiesto (una o piu' colonne, ciascuna crescente o decrescente)
+`SortIndex` mantiene una lista ordinata che aggiunte, modifiche e rimozioni
+aggiornano con una ricerca binaria: cambiare ordinamento e' solo una lettura.
+A parita' di chiavi vale l'ordine di inserimento (ordinamento stabile).
+"""
+
+import bisect
+import itertools
+
+from .schema import ACTIONS
+
+SORT_DAYS = 'days'
+SORT_TIME = 'time'
+SORT_ACTION = 'action'
+SORT_ENABLED = 'enabled'
+SORT_COLUMNS = (SORT_DAYS, SORT_TIME, SORT_ACTION, SORT_ENABLED)
+# Colonne secondarie conservate quando si ordina per una nuova colonna
+MAX_SORT_COLUMNS = len(SORT_COLUMNS)
+# Ordinamenti mantenuti contemporaneamente (ogni modifica li aggiorna tutti)
+MAX_CACHED_ORDERS = 8
+
+def _days_key(day_mask):
+    # Ordine lessicografico della lista dei giorni (Lun < Lun,Mar < Mar ...):
+    # ogni giorno e' una cifra in base 8, le posizioni vuote valgono 0
+    key = 0
+    digits = 0
+    for day in range(7):
+        if day_mask >> day & 1:
+            key = key * 8 + day + 1
+            digits += 1
+    return key * 8 ** (7 - digits)
+
+def sort_keys(s):
+    """Chiavi intere della regola, una per colonna di `SORT_COLUMNS`."""
+    return (
+        _days_key(s.day_mask),
+        s.minute,
+        ACTIONS.index(s.action) if s.action in ACTIONS else len(ACTIONS),
+        0 if s.enabled else 1,  # attive prima
+    )
+
+def _composite(keys, seq, spec):
+    # Le colonne decrescenti usano la chiave negata; `seq` rende stabile l'ordine
+    return tuple(-keys[col] if reverse else keys[col] for col, reverse in spec) + (seq,)
+
+class SortIndex:
+    """Ordinamenti delle regole mantenuti in modo incrementale, per `uid`.
+
+    Uno `spec` e' una tupla di coppie `(colonna, decrescente)` con colonna in
+    `SORT_COLUMNS`; la prima coppia e' la chiave primaria. Gli ordinamenti si
+    costruiscono alla prima richiesta e da li' in poi restano aggiornati.
+    """
+
+    def __init__(self, schedules=()):
+        self._seqs = itertools.count()
+        self._entries = {}  # uid -> (chiavi per colonna, numero di inserimento)
+        self._orders = {}   # spec -> (indici delle colonne, lista ordinata di (chiave composita, uid))
+        self.reset(schedules)
+
+    def reset(self, schedules):
+        """Sostituisce tutte le regole (es. configurazione ricaricata)."""
+        self._entries = {s.uid: (sort_keys(s), next(self._seqs)) for s in schedules}
+        self._orders = {}
+
+    def add(self, s):
+        entry = (sort_keys(s), next(self._seqs))
+        self._entries[s.uid] = entry
+        for columns, order in self._orders.values():
+            bisect.insort(order, (_composite(entry[0], entry[1], columns), s.uid))
+
+    def extend(self, schedules):
+        """Aggiunta in blocco: gli ordinamenti vengono ricostruiti una volta alla prossima richiesta."""
+        for s in schedules:
+            self._entries[s.uid] = (sort_keys(s), next(self._seqs))
+        self._orders = {}
+
+    def remove(self, s):
+        entry = self._entries.pop(s.uid, None)
+        if entry is None:
+            return
+        for columns, order in self._orders.values():
+            item = (_composite(entry[0], entry[1], columns), s.uid)
+            pos = bisect.bisect_left(order, item)
+            if pos < len(order) and order[pos] == item:
+                del order[pos]
+
+    def replace(self, old, new):
+        """Aggiorna una regola modificata mantenendo la sua posizione tra le pari."""
+        entry = self._entries.get(old.uid)
+        keys = sort_keys(new)
+        if entry is not None and entry[0] == keys and old.uid == new.uid:
+            return  # chiavi invariate (es. solo missed_policy): nessuno spostamento
+        seq = entry[1] if entry is not None else next(self._seqs)
+        self.remove(old)
+        self._entries[new.uid] = (keys, seq)
+        for columns, order in self._orders.values():
+            bisect.insort(order, (_composite(keys, seq, columns), new.uid))
+
+    def order(self, spec):
+        """uid delle regole nell'ordine di `spec`; spec vuoto = ordine di inserimento."""
+        spec = tuple(spec)
+        cached = self._orders.get(spec)
+        if cached is None:
+            columns = tuple((SORT_COLUMNS.index(col), reverse) for col, reverse in spec)
+            order = sorted(
+                (_composite(keys, seq, columns), uid) for uid, (keys, seq) in self._entries.items()
+            )
+            if len(self._orders) >= MAX_CACHED_ORDERS:
+                del self._orders[next(iter(self._orders))]
+            cached = self._orders[spec] = (columns, order)
+        return [uid for _, uid in cached[1]]
+
+def push_sort_column(spec, column):
+    """Nuovo spec dopo la scelta di `column`: diventa primaria, le altre restano come
+    chiavi secondarie; scegliere di nuovo la primaria ne inverte il verso."""
+    spec = tuple(spec)
+    if spec and spec[0][0] == column:
+        return ((column, not spec[0][1]),) + spec[1:]
+    rest = tuple(item for item in spec if item[0] != column)
+    return (((column, False),) + rest)[:MAX_SORT_COLUMNS]
@@ -0,0 +1,26 @@
+"""
+Palette e stili condivisi dalle viste della GUI.
+"""
+
+# Stili personalizzati (palette coerente, dark + accent blu)
+ACCENT_COLOR   = "#2563eb"  # blu più spento
+HOVER_COLOR    = "#2f6bdc"  # blu hover
+TEXT_COLOR     = "#e6e9ef"  # testo primario
+TEXT_DISABLED  = "#6b7280"  # testo disabilitato
+
+# Stili aggiuntivi per le card (monocromatici coerenti)
+CARD_BG        = "#14161a"
+CARD_BG_HOVER  = "#191c22"
+CARD_BG_SELECTED = "#1f2430"
+CARD_BORDER    = "#262a33"
+MUTED_TEXT     = "#a3a9b7"
+CONTENT_MAX_WIDTH = 1000  # larghezza massima della colonna cards centrata
+ROOT_BG        = "#0f1115"  # sfondo uniforme sotto alle card
+
+# Pill stato
+STATUS_ON  = "#16a34a"   # verde acceso
+STATUS_OFF = "#3f3f46"   # grigio scuro
+BTN_PRIMARY      = ACCENT_COLOR
+BTN_PRIMARY_HOV  = HOVER_COLOR
+BTN_DANGER       = "#ef4444"
+BTN_DANGER_HOV   = "#dc2626"
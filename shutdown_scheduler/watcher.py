@@ -0,0 +1,151 @@
+"""
+Ricaricamento a caldo della configurazione quando il file cambia su disco
+(es. regole distribuite dagli strumenti di deployment), senza riavviare l'app.
+
+Su Linux usa inotify sulla cartella del file (le scritture atomiche sostituiscono
+l'inode); altrove controlla periodicamente mtime/dimensione e, solo se cambiano,
+l'hash del contenuto. Il parsing avviene sul thread del watcher; al chiamante
+arriva una configurazione gia' valida.
+"""
+
+import os
+import sys
+import struct
+import select
+import threading
+from pathlib import Path
+
+from .config import content_digest, parse_config
+
+# Costanti inotify (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o4000
+_EVENT_HEADER = struct.Struct('iIII')
+
+def _open_inotify(directory):
+    """Descrittore inotify che osserva `directory`, o None se non disponibile."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+class ConfigWatcher(threading.Thread):
+    """Osserva `path` e chiama `on_change(cfg)` con la nuova configurazione.
+
+    `is_own_write(digest)` (tipicamente `ConfigWriter.is_own_write`) permette di
+    ignorare i file scritti dall'app stessa ed evitare cicli di ricaricamento.
+    """
+
+    def __init__(self, path, on_change, is_own_write=None, poll_interval=2.0):
+        super().__init__(name="ConfigWatcher", daemon=True)
+        self.path = Path(path)
+        self.on_change = on_change
+        self.is_own_write = is_own_write or (lambda digest: False)
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._stat = self._read_stat()
+        self._digest = self._read_digest()
+        self._wake_r, self._wake_w = os.pipe()
+
+    def stop(self):
+        self._stop_event.set()
+        try:
+            os.write(self._wake_w, b'x')
+        except OSError:
+            pass
+
+    def run(self):
+        fd = _open_inotify(self.path.parent)
+        try:
+            if fd is not None:
+                self._run_inotify(fd)
+            else:
+                self._run_polling()
+        finally:
+            if fd is not None:
+                os.close(fd)
+            for end in (self._wake_r, self._wake_w):
+                try:
+                    os.close(end)
+                except OSError:
+                    pass
+
+    def _run_inotify(self, fd):
+        name = os.fsencode(self.path.name)
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([fd, self._wake_r], [], [])
+            if fd not in ready:
+                continue
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            touched = False
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                start = offset + _EVENT_HEADER.size
+                if data[start:start + length].rstrip(b'\0') == name:
+                    touched = True
+                offset = start + length
+            if touched:
+                self._check()
+
+    def _run_polling(self):
+        while not self._stop_event.wait(self.poll_interval):
+            stat = self._read_stat()
+            if stat != self._stat:
+                self._stat = stat
+                self._check()
+
+    def _read_stat(self):
+        try:
+            st = self.path.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _read_digest(self):
+        try:
+            return content_digest(self.path.read_bytes())
+        except OSError:
+            return None
+
+    def _check(self):
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return
+        digest = content_digest(data)
+        if digest == self._digest:
+            return
+        self._digest = digest
+        if self.is_own_write(digest):
+            return
+        try:
+            cfg = parse_config(data.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
+            # File a meta' scrittura o non valido: si riprova alla prossima modifica
+            print('Configurazione modificata ma non valida, ignorata:', e)
+            self._digest = None
+            return
+        print('Configurazione modificata su disco: ricarico le regole')
+        try:
+            self.on_change(cfg)
+        except Exception as e:
+            print('Errore applicazione configurazione ricaricata:', e)
@@ -0,0 +1,35 @@
+"""
+Import in blocco: regole scartate, duplicate e in conflitto nel riepilogo.
+"""
+
+import io
+
+from shutdown_scheduler.bulk import FORMAT_JSONL, find_conflicts, import_rules
+from shutdown_scheduler.duplicates import DuplicateIndex
+from shutdown_scheduler.model import ALL_DAYS_MASK, Schedule
+
+def _import(text, existing=()):
+    return import_rules(io.StringIO(text), FORMAT_JSONL, DuplicateIndex(existing))
+
+def test_import_reports_conflicts_with_existing_and_imported_rules():
+    existing = [Schedule(ALL_DAYS_MASK, 22 * 60, 'shutdown')]
+    report = _import(
+        '{"days": [0], "time": "22:02", "action": "hibernate", "priority": 1}\n'
+        '{"days": [6], "time": "07:00", "action": "shutdown"}\n'
+        '{"days": [6], "time": "07:00", "action": "hibernate"}\n', existing)
+    assert len(report.accepted) == 3
+    conflicts = find_conflicts(report, existing, 5)
+    assert [(s.time, s.action) for s, _ in conflicts] == [('22:02', 'hibernate'), ('07:00', 'hibernate')]
+    assert [(c.distance, c.action) for c in conflicts[0][1]] == [(2, 'shutdown')]
+    assert conflicts[1][1][0].collision
+    summary = report.summary()
+    assert "Regole importate in conflitto: 2" in summary
+    assert "hibernate alle 22:02: shutdown alle 22:00 (a 2 min)" in summary
+    assert "hibernate alle 07:00: shutdown alle 07:00 (stesso minuto)" in summary
+
+def test_import_without_conflicts_keeps_the_short_summary():
+    report = _import('{"days": [0], "time": "08:00", "action": "shutdown"}\n{"bad json\n')
+    assert find_conflicts(report, [], 5) == []
+    lines = report.summary().splitlines()
+    assert lines[0] == "Regole importate: 1, scartate: 1 (di cui duplicate: 0)"
+    assert len(lines) == 2 and lines[1].startswith("  riga 2: JSON non valido")
@@ -0,0 +1,58 @@
+"""
+Prossime esecuzioni dello scheduler: devono mostrare solo le azioni che il
+motore eseguira' davvero dopo la risoluzione dei conflitti.
+"""
+
+import datetime
+import threading
+
+from shutdown_scheduler.engine import SchedulerThread
+from shutdown_scheduler.model import ALL_DAYS_MASK, Schedule
+
+MONDAY = datetime.datetime(2026, 10, 12)
+
+class _RecordingExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, action):
+        self.submitted.append(action)
+
+    def shutdown(self, wait=False):
+        pass
+
+def _scheduler(schedules, conflict_window=5):
+    sched = SchedulerThread(threading.Event(), schedules=schedules, executor=_RecordingExecutor(),
+                            conflict_window=conflict_window)
+    sched._arm(sched.snapshot, MONDAY)
+    return sched
+
+def test_upcoming_skips_rules_that_yield_to_a_higher_priority():
+    shutdown = Schedule(ALL_DAYS_MASK, 22 * 60, 'shutdown', priority=0)
+    hibernate = Schedule(ALL_DAYS_MASK, 22 * 60 + 3, 'hibernate', priority=1)
+    sched = _scheduler([shutdown, hibernate])
+    events = sched.upcoming(3, now=MONDAY)
+    assert [(when, s.action) for when, s in events] == [
+        (MONDAY.replace(hour=22, minute=3) + datetime.timedelta(days=day), 'hibernate') for day in range(3)]
+
+def test_upcoming_matches_the_fired_actions():
+    shutdown = Schedule(ALL_DAYS_MASK, 22 * 60, 'shutdown', priority=0)
+    hibernate = Schedule(ALL_DAYS_MASK, 22 * 60 + 3, 'hibernate', priority=1)
+    late = Schedule(ALL_DAYS_MASK, 22 * 60 + 6, 'shutdown', priority=0)
+    sched = _scheduler([shutdown, hibernate, late])
+    announced = [s.action for _, s in sched.upcoming(1, now=MONDAY)]
+    while sched._next_fire is not None and sched._next_fire < MONDAY + datetime.timedelta(days=1):
+        sched._fire_due(sched._next_fire + datetime.timedelta(seconds=5))
+    assert announced == sched.executor.submitted == ['hibernate']
+
+def test_upcoming_honours_the_window_of_the_last_action():
+    hibernate = Schedule(ALL_DAYS_MASK, 22 * 60, 'hibernate')
+    shutdown = Schedule(ALL_DAYS_MASK, 22 * 60 + 4, 'shutdown')
+    sched = _scheduler([hibernate, shutdown])
+    sched._fire_due(MONDAY.replace(hour=22, second=5))
+    events = sched.upcoming(1, now=MONDAY.replace(hour=22, minute=1))
+    assert [(when, s.action) for when, s in events] == [(MONDAY.replace(hour=22) + datetime.timedelta(days=1),
+                                                         'hibernate')]
+
+def test_upcoming_without_rules_is_empty():
+    assert _scheduler([Schedule(ALL_DAYS_MASK, 60, 'shutdown', enabled=False)]).upcoming(now=MONDAY) == []
@@ -0,0 +1,104 @@
+"""
+Lo scheduler e il simulatore devono prendere le stesse decisioni: stesse
+esecuzioni e stesse regole saltate per conflitto su insiemi di regole casuali.
+
+Il motore viene pilotato senza thread ne' orologio: dopo `_arm` si chiama
+`_fire_due` a ogni scadenza armata, con un executor che registra le azioni.
+"""
+
+import random
+import datetime
+import threading
+
+import pytest
+
+from shutdown_scheduler.engine import MISSED_FIRE_ONCE, SchedulerThread
+from shutdown_scheduler.model import Schedule
+from shutdown_scheduler.schema import ACTIONS
+from shutdown_scheduler.simulate import simulate
+
+MONDAY = datetime.datetime(2026, 10, 12)
+
+class _RecordingExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, action):
+        self.submitted.append(action)
+
+    def shutdown(self, wait=False):
+        pass
+
+def _scheduler(schedules, conflict_window):
+    sched = SchedulerThread(threading.Event(), schedules=schedules, executor=_RecordingExecutor(),
+                            conflict_window=conflict_window)
+    fired = []
+    fire = sched._fire
+
+    # Registra solo le regole eseguite davvero (non quelle saltate per conflitto)
+    def _fire(s, when, now):
+        before = sched._fires
+        fire(s, when, now)
+        if sched._fires != before:
+            fired.append((when, s.uid))
+
+    sched._fire = _fire
+    return sched, fired
+
+def run_engine(schedules, start, end, conflict_window, delay=datetime.timedelta(seconds=5)):
+    """Esecuzioni del motore armato a `start`, risvegliato `delay` dopo ogni scadenza fino a `end`."""
+    sched, fired = _scheduler(schedules, conflict_window)
+    sched._arm(sched.snapshot, start)
+    while sched._next_fire is not None and sched._next_fire < end:
+        sched._fire_due(sched._next_fire + delay)
+    return fired
+
+def random_rules(rng, count):
+    rules = []
+    for _ in range(count):
+        # Orari concentrati in poche ore per avere molti conflitti
+        rules.append(Schedule(
+            rng.randint(1, 0b1111111), rng.choice((rng.randint(0, 180), rng.randint(1380, 1439))),
+            rng.choice(ACTIONS), enabled=rng.random() > 0.15, priority=rng.randint(0, 3)))
+    return rules
+
+@pytest.mark.parametrize('seed', range(40))
+def test_engine_matches_simulator(seed):
+    rng = random.Random(seed)
+    schedules = random_rules(rng, rng.randint(1, 25))
+    conflict_window = rng.choice((0, 1, 5, 30, 90))
+    # Inizio a meta' minuto (spesso proprio in quello di una regola): il minuto in corso
+    # non appartiene all'intervallo
+    start = MONDAY + datetime.timedelta(minutes=rng.randint(0, 7 * 1440), seconds=rng.randint(1, 59))
+    occurrences = simulate(schedules, start, start + datetime.timedelta(weeks=1))
+    if occurrences and rng.random() < 0.5:
+        start = rng.choice(occurrences)[0] + datetime.timedelta(seconds=rng.randint(1, 59))
+    end = start + datetime.timedelta(days=rng.randint(1, 21), minutes=rng.randint(0, 1439))
+    expected = [(when, schedules[idx].uid) for when, idx in simulate(schedules, start, end,
+                                                                     conflict_window=conflict_window)]
+    assert run_engine(schedules, start, end, conflict_window) == expected
+
+def test_arm_skips_the_current_minute():
+    rule = Schedule(0b0000001, 10 * 60 + 30, 'shutdown')
+    start = MONDAY.replace(hour=10, minute=30, second=40)
+    fired = run_engine([rule], start, start + datetime.timedelta(weeks=1, minutes=1), conflict_window=5)
+    assert fired == [(MONDAY.replace(hour=10, minute=30) + datetime.timedelta(weeks=1), rule.uid)]
+
+def test_missed_replay_runs_one_action_per_window():
+    # Sospensione dalle 01:00 alle 08:00: entrambe le regole vengono recuperate nello stesso istante
+    low = Schedule(0b0000001, 2 * 60, 'shutdown', missed_policy=MISSED_FIRE_ONCE, priority=0)
+    high = Schedule(0b0000001, 3 * 60, 'hibernate', missed_policy=MISSED_FIRE_ONCE, priority=1)
+    sched, fired = _scheduler([low, high], conflict_window=5)
+    sched._arm(sched.snapshot, MONDAY.replace(hour=1))
+    sched._fire_due(MONDAY.replace(hour=8))
+    assert fired == [(MONDAY.replace(hour=3), high.uid)]
+    assert sched.executor.submitted == ['hibernate']
+
+def test_simulator_yields_to_rules_after_the_end():
+    low = Schedule(0b1000000, 23 * 60 + 58, 'hibernate', priority=0)
+    high = Schedule(0b0000001, 1, 'shutdown', priority=1)
+    start = MONDAY + datetime.timedelta(days=6)
+    end = MONDAY + datetime.timedelta(weeks=1)
+    assert simulate([low, high], start, end, conflict_window=5) == []
+    assert simulate([low, high], start, end) == [(start.replace(hour=23, minute=58), 0)]
+    assert run_engine([low, high], start, end, conflict_window=5) == []